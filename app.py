@@ -7,13 +7,14 @@ import streamlit as st
 import json
 import base64
 from datetime import datetime
-import pandas as pd
-from PIL import Image, ImageDraw, ImageFont
 import io
 import sqlite3
-import csv
 import hashlib
-import pytz
+import hmac
+import secrets
+import threading
+import time
+from zoneinfo import ZoneInfo
 
 # Page configuration
 st.set_page_config(
@@ -25,7 +26,12 @@ st.set_page_config(
 
 # Constants
 APP_VERSION = "2.0.0"
-NIGERIA_TZ = pytz.timezone('Africa/Lagos')
+NIGERIA_TZ = ZoneInfo('Africa/Lagos')
+PHOTO_MAX_EDGE = 1600
+PHOTO_JPEG_QUALITY = 75
+DB_LOCK_RETRIES = 3
+ADMIN_USERNAME = "admin"
+ADMIN_PASSWORD_SHA256 = hashlib.sha256(b"admin123").hexdigest()
 
 # Nigerian Geopolitical Zones and States
 NIGERIAN_REGIONS = {
@@ -36,6 +42,8 @@ NIGERIAN_REGIONS = {
     "South South": ["Akwa Ibom", "Bayelsa", "Cross River", "Delta", "Edo", "Rivers"],
     "South West": ["Ekiti", "Lagos", "Ogun", "Ondo", "Osun", "Oyo"]
 }
+ZONES = tuple(NIGERIAN_REGIONS)
+STATE_LISTS = {zone: tuple(states) for zone, states in NIGERIAN_REGIONS.items()}
 
 # Initialize session state
 if 'consent_given' not in st.session_state:
@@ -58,9 +66,11 @@ if 'admin_authenticated' not in st.session_state:
     st.session_state.admin_authenticated = False
 if 'view_submissions' not in st.session_state:
     st.session_state.view_submissions = False
+if 'pending_submission' not in st.session_state:
+    st.session_state.pending_submission = None
 
 # Custom CSS
-st.markdown("""
+APP_CSS = """
 <style>
     .main-header {
         font-size: 2.5rem;
@@ -140,13 +150,24 @@ st.markdown("""
         background-color: #f9fafb;
     }
 </style>
-""", unsafe_allow_html=True)
+"""
+st.markdown(APP_CSS, unsafe_allow_html=True)
 
 # Database setup
+@st.cache_resource
 def init_database():
-    conn = sqlite3.connect('submissions.db', check_same_thread=False)
+    conn = sqlite3.connect('submissions.db', check_same_thread=False, isolation_level=None)
     c = conn.cursor()
     
+    # WAL lets admin reads proceed while a submission is being written
+    c.execute("PRAGMA journal_mode=WAL")
+    c.execute("PRAGMA synchronous=NORMAL")
+    c.execute("PRAGMA busy_timeout=5000")
+    c.execute("PRAGMA cache_size=-20000")
+    c.execute("PRAGMA temp_store=MEMORY")
+    c.execute("PRAGMA mmap_size=268435456")
+    
+    c.execute("BEGIN")
     c.execute('''
         CREATE TABLE IF NOT EXISTS submissions (
             id INTEGER PRIMARY KEY AUTOINCREMENT,
@@ -165,82 +186,168 @@ def init_database():
             photo_timestamp TEXT,
             photo_latitude REAL,
             photo_longitude REAL,
-            photo_data BLOB,
             station_name TEXT,
             station_type TEXT
         )
     ''')
     
-    conn.commit()
+    # Admin list is ordered by newest first, optionally filtered by status
+    c.execute("CREATE INDEX IF NOT EXISTS idx_submissions_ts ON submissions(submission_timestamp DESC)")
+    c.execute("CREATE INDEX IF NOT EXISTS idx_submissions_status_ts ON submissions(status, submission_timestamp DESC)")
+    
+    # Photos live in their own table so admin list scans don't page through BLOBs
+    c.execute('''
+        CREATE TABLE IF NOT EXISTS submission_photos (
+            submission_id TEXT PRIMARY KEY,
+            photo_data BLOB
+        )
+    ''')
+    
+    c.execute("COMMIT")
+    return conn
+
+@st.cache_resource
+def init_read_connection():
+    # Separate read-only handle so admin queries never queue behind a photo insert
+    conn = sqlite3.connect('file:submissions.db?mode=ro', uri=True, check_same_thread=False)
+    c = conn.cursor()
+    c.execute("PRAGMA busy_timeout=5000")
+    c.execute("PRAGMA cache_size=-20000")
+    c.execute("PRAGMA temp_store=MEMORY")
+    c.execute("PRAGMA mmap_size=268435456")
     return conn
 
+@st.cache_resource
+def get_db_write_lock():
+    return threading.Lock()
+
 DB_CONN = init_database()
+RO_CONN = init_read_connection()
+DB_WRITE_LOCK = get_db_write_lock()
+
+SUBMISSION_INSERT_SQL = '''
+    INSERT INTO submissions (
+        submission_id, full_name, email, phone, geopolitical_zone, state, lga, address,
+        latitude, longitude, submission_timestamp, status,
+        photo_timestamp, photo_latitude, photo_longitude,
+        station_name, station_type
+    ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+    ON CONFLICT(submission_id) DO NOTHING
+'''
+PHOTO_INSERT_SQL = '''
+    INSERT INTO submission_photos (submission_id, photo_data)
+    VALUES (?, ?)
+    ON CONFLICT(submission_id) DO NOTHING
+'''
 
-def save_submission_to_db(submission_data, photo_bytes=None, photo_metadata=None):
+def _safe_float(value):
+    if value is None:
+        return None
     try:
+        return float(value)
+    except (ValueError, TypeError):
+        return None
+
+def _submission_row(submission_data, photo_metadata=None):
+    """Parameter tuple for SUBMISSION_INSERT_SQL"""
+    # Combine submission data with photo metadata
+    photo_metadata = photo_metadata or {}
+    return (
+        submission_data.get('submission_id'),
+        submission_data.get('full_name'),
+        submission_data.get('email'),
+        submission_data.get('phone'),
+        submission_data.get('geopolitical_zone'),
+        submission_data.get('state'),
+        submission_data.get('lga'),
+        submission_data.get('address', ''),
+        submission_data.get('latitude'),
+        submission_data.get('longitude'),
+        submission_data.get('submission_timestamp'),
+        'pending',
+        photo_metadata.get('timestamp'),
+        _safe_float(photo_metadata.get('latitude')),
+        _safe_float(photo_metadata.get('longitude')),
+        submission_data.get('station_name', ''),
+        submission_data.get('station_type', '')
+    )
+
+def _write_submissions(entries):
+    """Insert (submission_data, photo_bytes, photo_metadata) entries in one transaction.
+    
+    Entries whose submission_id already exists are skipped; returns the number inserted.
+    """
+    submission_rows = []
+    photo_rows = []
+    for submission_data, photo_bytes, photo_metadata in entries:
+        submission_rows.append(_submission_row(submission_data, photo_metadata))
+        if photo_bytes is not None:
+            photo_rows.append((submission_data.get('submission_id'), photo_bytes))
+    
+    with DB_WRITE_LOCK:
         c = DB_CONN.cursor()
         
-        # Combine submission data with photo metadata
-        submission_data_with_meta = submission_data.copy()
-        if photo_metadata:
-            submission_data_with_meta['photo_timestamp'] = photo_metadata.get('timestamp')
-            
-            # Safely get latitude
-            photo_lat = photo_metadata.get('latitude')
-            if photo_lat is not None:
-                try:
-                    submission_data_with_meta['photo_latitude'] = float(photo_lat)
-                except (ValueError, TypeError):
-                    submission_data_with_meta['photo_latitude'] = None
-            
-            # Safely get longitude
-            photo_lon = photo_metadata.get('longitude')
-            if photo_lon is not None:
-                try:
-                    submission_data_with_meta['photo_longitude'] = float(photo_lon)
-                except (ValueError, TypeError):
-                    submission_data_with_meta['photo_longitude'] = None
+        # Take the write lock up front so all inserts land in one fsync
+        for attempt in range(DB_LOCK_RETRIES):
+            try:
+                c.execute("BEGIN IMMEDIATE")
+                break
+            except sqlite3.OperationalError as e:
+                if 'locked' not in str(e) or attempt == DB_LOCK_RETRIES - 1:
+                    raise
+                time.sleep(0.05)
         
-        c.execute('''
-            INSERT INTO submissions (
-                submission_id, full_name, email, phone, geopolitical_zone, state, lga, address,
-                latitude, longitude, submission_timestamp, status,
-                photo_timestamp, photo_latitude, photo_longitude, photo_data,
-                station_name, station_type
-            ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-        ''', (
-            submission_data_with_meta.get('submission_id'),
-            submission_data_with_meta.get('full_name'),
-            submission_data_with_meta.get('email'),
-            submission_data_with_meta.get('phone'),
-            submission_data_with_meta.get('geopolitical_zone'),
-            submission_data_with_meta.get('state'),
-            submission_data_with_meta.get('lga'),
-            submission_data_with_meta.get('address', ''),
-            submission_data_with_meta.get('latitude'),
-            submission_data_with_meta.get('longitude'),
-            submission_data_with_meta.get('submission_timestamp'),
-            'pending',
-            submission_data_with_meta.get('photo_timestamp'),
-            submission_data_with_meta.get('photo_latitude'),
-            submission_data_with_meta.get('photo_longitude'),
-            photo_bytes,
-            submission_data_with_meta.get('station_name', ''),
-            submission_data_with_meta.get('station_type', '')
-        ))
-        
-        DB_CONN.commit()
-        return True
+        try:
+            c.executemany(SUBMISSION_INSERT_SQL, submission_rows)
+            inserted = c.rowcount
+            if photo_rows:
+                c.executemany(PHOTO_INSERT_SQL, photo_rows)
+            c.execute("COMMIT")
+        except Exception:
+            # A failed COMMIT may already have ended the transaction; don't mask the real error
+            if DB_CONN.in_transaction:
+                c.execute("ROLLBACK")
+            raise
+    
+    load_submissions_df.clear()
+    submissions_csv.clear()
+    return inserted
+
+def save_submission_to_db(submission_data, photo_bytes=None, photo_metadata=None, resubmit=False):
+    """Save one submission; resubmit marks a repeat of this session's own submission_id"""
+    try:
+        inserted = _write_submissions([(submission_data, photo_bytes, photo_metadata)])
     except Exception as e:
         st.error(f"Database error: {str(e)}")
         return False
+    
+    if inserted:
+        return True
+    if resubmit:
+        # An earlier run of this session committed the row before it was interrupted
+        return True
+    st.error(f"Submission ID {submission_data.get('submission_id')} is already in use. Please submit again.")
+    return False
+
+def save_submissions_bulk(entries):
+    """Batch-import submissions; returns the number of rows written"""
+    try:
+        return _write_submissions(entries)
+    except Exception as e:
+        st.error(f"Database error: {str(e)}")
+        return 0
 
 def get_all_submissions():
     try:
-        c = DB_CONN.cursor()
+        c = RO_CONN.cursor()
+        # Timestamps are trimmed to 'YYYY-MM-DD HH:MM' in SQL. substr keeps the
+        # stored Lagos wall-clock time, whereas strftime() would convert to UTC.
         c.execute('''
             SELECT id, submission_id, full_name, email, phone, geopolitical_zone, state,
-                   photo_timestamp, photo_latitude, photo_longitude, submission_timestamp, status
+                   substr(replace(photo_timestamp, 'T', ' '), 1, 16),
+                   photo_latitude, photo_longitude,
+                   substr(replace(submission_timestamp, 'T', ' '), 1, 16),
+                   status
             FROM submissions 
             ORDER BY submission_timestamp DESC
         ''')
@@ -248,25 +355,143 @@ def get_all_submissions():
     except:
         return []
 
-# Step indicator function using Streamlit columns
+@st.cache_data(ttl=30, show_spinner=False)
+def load_submissions_df():
+    """Admin dashboard table, cached until the next submission or TTL expiry"""
+    import pandas as pd
+    
+    return pd.DataFrame(get_all_submissions(), columns=[
+        'ID', 'Submission ID', 'Owner Name', 'Email', 'Phone', 'Zone', 'State',
+        'Photo Time', 'Photo Lat', 'Photo Lon', 'Submission Time', 'Status'
+    ])
+
+@st.cache_data(ttl=30, show_spinner=False)
+def submissions_csv(df):
+    return df.to_csv(index=False).encode('utf-8')
+
+# Step indicator, prebuilt once per step so reruns only pick a string
+STEP_NAMES = ["Consent", "Information", "Station Photo", "Location", "Review"]
+
+def _build_step_indicator(current_step):
+    items = []
+    for i, step_name in enumerate(STEP_NAMES, 1):
+        active_class = " active" if i == current_step else ""
+        items.append(
+            f'<div class="step-item{active_class}">'
+            f'<div class="step-number">{i}</div>'
+            f'<div class="step-label">{step_name}</div>'
+            '</div>'
+        )
+    return f'<div class="step-container">{"".join(items)}</div>'
+
+STEP_INDICATOR_HTML = tuple(_build_step_indicator(i) for i in range(1, len(STEP_NAMES) + 1))
+
 def show_step_indicator_simple():
-    """Use Streamlit columns for steps"""
-    steps = ["Consent", "Information", "Station Photo", "Location", "Review"]
+    """Render the prebuilt step bar for the current step"""
+    st.markdown(STEP_INDICATOR_HTML[st.session_state.current_step - 1], unsafe_allow_html=True)
+
+# Step 4 runs as a fragment so coordinate edits only rerender this step
+@st.fragment
+def location_verification_step():
+    st.markdown("### Step 4: Location Verification")
     
-    cols = st.columns(5)
-    for i, (col, step_name) in enumerate(zip(cols, steps), 1):
-        with col:
-            is_active = i == st.session_state.current_step
-            bg_color = "#1E3A8A" if is_active else "#e5e7eb"
-            text_color = "white" if is_active else "#6b7280"
-            
-            st.markdown(f"""
-            <div style="text-align: center; padding: 10px; border-radius: 5px; 
-                        background-color: {bg_color}; color: {text_color}; font-weight: bold;">
-                <div style="font-size: 1.2rem;">{i}</div>
-                <div style="font-size: 0.9rem;">{step_name}</div>
-            </div>
-            """, unsafe_allow_html=True)
+    st.markdown("### Verify Station Coordinates")
+    
+    # Show photo preview with metadata
+    if st.session_state.photo_captured and st.session_state.photo_metadata:
+        col_preview1, col_preview2 = st.columns(2)
+        with col_preview1:
+            st.markdown("#### Photo with Metadata")
+            try:
+                if hasattr(st.session_state.photo_captured, 'seek'):
+                    st.session_state.photo_captured.seek(0)
+                st.image(st.session_state.photo_captured, caption="Your Station Photo", width=250)
+            except:
+                st.info("Photo preview not available")
+        
+        with col_preview2:
+            st.markdown("#### Embedded Metadata")
+            meta = st.session_state.photo_metadata
+            # One markdown element instead of a write per line
+            meta_lines = [f"**Timestamp:** {meta.get('timestamp')}"]
+            if meta.get('station_name'):
+                meta_lines.append(f"**Station:** {meta.get('station_name')}")
+            if meta.get('latitude') and meta.get('longitude'):
+                meta_lines.append(f"**Photo Coordinates:** {meta.get('latitude'):.6f}, {meta.get('longitude'):.6f}")
+            meta_lines.append(f"**Metadata Status:** {'✅ Embedded' if meta.get('has_metadata_overlay', False) else '⚠️ Not embedded'}")
+            st.markdown("\n\n".join(meta_lines))
+    
+    st.markdown("### Enter/Verify Station Coordinates")
+    
+    col_lat, col_lon = st.columns(2)
+    with col_lat:
+        # Get default latitude safely
+        default_lat = 0.0
+        if (st.session_state.photo_metadata and 
+            st.session_state.photo_metadata.get('latitude') is not None):
+            try:
+                default_lat = float(st.session_state.photo_metadata['latitude'])
+            except (ValueError, TypeError):
+                default_lat = 0.0
+        
+        latitude = st.number_input("Latitude *", format="%.6f", value=default_lat,
+                                 help="Example: 9.076479 (for Abuja)")
+    
+    with col_lon:
+        # Get default longitude safely
+        default_lon = 0.0
+        if (st.session_state.photo_metadata and 
+            st.session_state.photo_metadata.get('longitude') is not None):
+            try:
+                default_lon = float(st.session_state.photo_metadata['longitude'])
+            except (ValueError, TypeError):
+                default_lon = 0.0
+        
+        longitude = st.number_input("Longitude *", format="%.6f", value=default_lon,
+                                  help="Example: 7.398574 (for Abuja)")
+    
+    # Show station information
+    if st.session_state.client_data:
+        st.info(f"""
+        **Station Information:**
+        - **Station Name:** {st.session_state.client_data.get('station_name')}
+        - **Station Type:** {st.session_state.client_data.get('station_type')}
+        - **State:** {st.session_state.client_data.get('state')}
+        - **LGA:** {st.session_state.client_data.get('lga')}
+        - **Address:** {st.session_state.client_data.get('address', 'Not provided')}
+        """)
+    
+    # Show map preview
+    if latitude != 0.0 and longitude != 0.0:
+        st.map({'lat': [latitude], 'lon': [longitude]}, zoom=15)
+        st.caption("Map preview of station location coordinates")
+    
+    col_btn1, col_btn2, col_btn3 = st.columns(3)
+    with col_btn1:
+        if st.button("← Back to Photo"):
+            st.session_state.current_step = 3
+            st.rerun()
+    
+    with col_btn3:
+        if st.button("Next: Review & Submit →", type="primary"):
+            if latitude != 0.0 and longitude != 0.0:
+                # Update location data
+                st.session_state.location_data = {
+                    'latitude': latitude,
+                    'longitude': longitude,
+                    'timestamp': datetime.now(NIGERIA_TZ).isoformat(timespec='seconds')
+                }
+                
+                # Update photo metadata with verified coordinates
+                if st.session_state.photo_metadata:
+                    st.session_state.photo_metadata['latitude'] = latitude
+                    st.session_state.photo_metadata['longitude'] = longitude
+                    st.session_state.photo_metadata['coordinates_verified'] = True
+                
+                st.session_state.current_step = 5
+                st.rerun()
+            else:
+                st.error("❌ Please enter valid station coordinates")
 
 # Header
 st.markdown('<h1 class="main-header">⛽ Station Onboarding System</h1>', unsafe_allow_html=True)
@@ -280,7 +505,8 @@ with st.sidebar:
         admin_pass = st.text_input("Password", type="password")
         
         if st.button("Login"):
-            if admin_user == "admin" and admin_pass == "admin123":
+            pass_hash = hashlib.sha256(admin_pass.encode()).hexdigest()
+            if admin_user == ADMIN_USERNAME and hmac.compare_digest(pass_hash, ADMIN_PASSWORD_SHA256):
                 st.session_state.admin_authenticated = True
                 st.success("Login successful!")
                 st.rerun()
@@ -300,27 +526,17 @@ with st.sidebar:
 if st.session_state.admin_authenticated and st.session_state.view_submissions:
     st.markdown("## Admin Dashboard - Station Registrations")
     
-    submissions = get_all_submissions()
-    if submissions:
-        df = pd.DataFrame(submissions, columns=[
-            'ID', 'Submission ID', 'Owner Name', 'Email', 'Phone', 'Zone', 'State',
-            'Photo Time', 'Photo Lat', 'Photo Lon', 'Submission Time', 'Status'
-        ])
-        
-        # Format columns
-        if 'Photo Time' in df.columns:
-            df['Photo Time'] = pd.to_datetime(df['Photo Time']).dt.strftime('%Y-%m-%d %H:%M')
-        if 'Submission Time' in df.columns:
-            df['Submission Time'] = pd.to_datetime(df['Submission Time']).dt.strftime('%Y-%m-%d %H:%M')
-        
+    df = load_submissions_df()
+    if not df.empty:
         st.dataframe(df[['Submission ID', 'Owner Name', 'Phone', 'Zone', 'State', 'Photo Time', 'Status']])
         
         # Export functionality
-        if st.button("Export to CSV"):
-            csv_data = df.to_csv(index=False)
-            b64 = base64.b64encode(csv_data.encode()).decode()
-            href = f'<a href="data:file/csv;base64,{b64}" download="station_registrations.csv">📥 Download CSV</a>'
-            st.markdown(href, unsafe_allow_html=True)
+        st.download_button(
+            "📥 Export to CSV",
+            data=submissions_csv(df),
+            file_name="station_registrations.csv",
+            mime="text/csv"
+        )
     else:
         st.info("No station registrations yet")
     
@@ -419,7 +635,7 @@ else:
             # Zone selection - updates session state immediately
             zone = st.selectbox(
                 "Geopolitical Zone *",
-                list(NIGERIAN_REGIONS.keys()),
+                ZONES,
                 index=None,
                 placeholder="Select station zone",
                 key="zone_select"
@@ -433,7 +649,7 @@ else:
         
         with loc_col2:
             # State selection - IMMEDIATELY appears when Zone is selected
-            state_options = NIGERIAN_REGIONS[st.session_state.selected_zone] if st.session_state.selected_zone else []
+            state_options = STATE_LISTS[st.session_state.selected_zone] if st.session_state.selected_zone else ()
             
             # Get current state value
             current_state = st.session_state.get('selected_state')
@@ -569,12 +785,14 @@ else:
                 timestamp = datetime.now(NIGERIA_TZ).strftime('%Y-%m-%d %H:%M:%S')
                 
                 # Process image to add metadata overlay
+                from PIL import Image, ImageDraw, ImageFont
                 try:
                     # Open the original image
                     original_image = Image.open(photo)
                     
-                    # Create a copy for metadata overlay
-                    img_with_meta = original_image.copy()
+                    # Create a downscaled RGB copy for metadata overlay
+                    img_with_meta = original_image.convert('RGB')
+                    img_with_meta.thumbnail((PHOTO_MAX_EDGE, PHOTO_MAX_EDGE), Image.LANCZOS)
                     draw = ImageDraw.Draw(img_with_meta)
                     
                     # Try to load a font, fallback to default
@@ -632,7 +850,8 @@ else:
                     
                     # Save the processed image to BytesIO
                     img_bytes = io.BytesIO()
-                    img_with_meta.save(img_bytes, format='JPEG', quality=95)
+                    img_with_meta.save(img_bytes, format='JPEG', quality=PHOTO_JPEG_QUALITY,
+                                       optimize=True, progressive=True)
                     img_bytes.seek(0)
                     
                     # Store in session state with safe coordinate handling
@@ -643,6 +862,7 @@ else:
                         'longitude': float(lon) if lon is not None else None,
                         'station_name': station_name,
                         'image_format': 'JPEG',
+                        'image_bytes': img_bytes.getbuffer().nbytes,
                         'has_metadata_overlay': True
                     }
                     
@@ -658,8 +878,7 @@ else:
                     st.error(f"Error processing image: {str(e)}")
                     # Fallback: save original photo without metadata
                     st.session_state.photo_captured = photo
-                    image = Image.open(photo)
-                    st.image(image, caption="Station Photo", width=150)
+                    st.image(photo, caption="Station Photo", width=150)
                     st.warning("⚠️ Photo captured but metadata embedding failed")
                     st.session_state.photo_metadata = {
                         'timestamp': timestamp,
@@ -696,110 +915,7 @@ else:
     
     # Step 4: Location Verification - FIXED: Safe coordinate handling
     elif st.session_state.current_step == 4:
-        st.markdown("### Step 4: Location Verification")
-        
-        st.markdown("### Verify Station Coordinates")
-        
-        # Show photo preview with metadata
-        if st.session_state.photo_captured and st.session_state.photo_metadata:
-            col_preview1, col_preview2 = st.columns(2)
-            with col_preview1:
-                st.markdown("#### Photo with Metadata")
-                try:
-                    if hasattr(st.session_state.photo_captured, 'read'):
-                        st.session_state.photo_captured.seek(0)
-                        image = Image.open(st.session_state.photo_captured)
-                    else:
-                        image = Image.open(st.session_state.photo_captured)
-                    st.image(image, caption="Your Station Photo", width=250)
-                except:
-                    st.info("Photo preview not available")
-            
-            with col_preview2:
-                st.markdown("#### Embedded Metadata")
-                meta = st.session_state.photo_metadata
-                st.write(f"**Timestamp:** {meta.get('timestamp')}")
-                if meta.get('station_name'):
-                    st.write(f"**Station:** {meta.get('station_name')}")
-                if meta.get('latitude') and meta.get('longitude'):
-                    st.write(f"**Photo Coordinates:** {meta.get('latitude'):.6f}, {meta.get('longitude'):.6f}")
-                st.write(f"**Metadata Status:** {'✅ Embedded' if meta.get('has_metadata_overlay', False) else '⚠️ Not embedded'}")
-        
-        st.markdown("### Enter/Verify Station Coordinates")
-        
-        col_lat, col_lon = st.columns(2)
-        with col_lat:
-            # Get default latitude safely
-            default_lat = 0.0
-            if (st.session_state.photo_metadata and 
-                st.session_state.photo_metadata.get('latitude') is not None):
-                try:
-                    default_lat = float(st.session_state.photo_metadata['latitude'])
-                except (ValueError, TypeError):
-                    default_lat = 0.0
-            
-            latitude = st.number_input("Latitude *", format="%.6f", value=default_lat,
-                                     help="Example: 9.076479 (for Abuja)")
-        
-        with col_lon:
-            # Get default longitude safely
-            default_lon = 0.0
-            if (st.session_state.photo_metadata and 
-                st.session_state.photo_metadata.get('longitude') is not None):
-                try:
-                    default_lon = float(st.session_state.photo_metadata['longitude'])
-                except (ValueError, TypeError):
-                    default_lon = 0.0
-            
-            longitude = st.number_input("Longitude *", format="%.6f", value=default_lon,
-                                      help="Example: 7.398574 (for Abuja)")
-        
-        # Show station information
-        if st.session_state.client_data:
-            st.info(f"""
-            **Station Information:**
-            - **Station Name:** {st.session_state.client_data.get('station_name')}
-            - **Station Type:** {st.session_state.client_data.get('station_type')}
-            - **State:** {st.session_state.client_data.get('state')}
-            - **LGA:** {st.session_state.client_data.get('lga')}
-            - **Address:** {st.session_state.client_data.get('address', 'Not provided')}
-            """)
-        
-        # Show map preview
-        if latitude != 0.0 and longitude != 0.0:
-            location_df = pd.DataFrame({
-                'lat': [latitude],
-                'lon': [longitude]
-            })
-            st.map(location_df, zoom=15)
-            st.caption("Map preview of station location coordinates")
-        
-        col_btn1, col_btn2, col_btn3 = st.columns(3)
-        with col_btn1:
-            if st.button("← Back to Photo"):
-                st.session_state.current_step = 3
-                st.rerun()
-        
-        with col_btn3:
-            if st.button("Next: Review & Submit →", type="primary"):
-                if latitude != 0.0 and longitude != 0.0:
-                    # Update location data
-                    st.session_state.location_data = {
-                        'latitude': latitude,
-                        'longitude': longitude,
-                        'timestamp': datetime.now(NIGERIA_TZ).isoformat()
-                    }
-                    
-                    # Update photo metadata with verified coordinates
-                    if st.session_state.photo_metadata:
-                        st.session_state.photo_metadata['latitude'] = latitude
-                        st.session_state.photo_metadata['longitude'] = longitude
-                        st.session_state.photo_metadata['coordinates_verified'] = True
-                    
-                    st.session_state.current_step = 5
-                    st.rerun()
-                else:
-                    st.error("❌ Please enter valid station coordinates")
+        location_verification_step()
     
     # Step 5: Review & Submit
     elif st.session_state.current_step == 5:
@@ -832,13 +948,10 @@ else:
                 # Show photo with metadata
                 if st.session_state.photo_captured:
                     try:
-                        if hasattr(st.session_state.photo_captured, 'read'):
+                        if hasattr(st.session_state.photo_captured, 'seek'):
                             st.session_state.photo_captured.seek(0)
-                            image = Image.open(st.session_state.photo_captured)
-                        else:
-                            image = Image.open(st.session_state.photo_captured)
                         
-                        st.image(image, caption="Station Photo with Embedded Metadata", width=250)
+                        st.image(st.session_state.photo_captured, caption="Station Photo with Embedded Metadata", width=250)
                         
                         # Show metadata details
                         if hasattr(st.session_state, 'photo_metadata') and st.session_state.photo_metadata:
@@ -860,11 +973,7 @@ else:
                 loc = st.session_state.location_data
                 st.write(f"**Verified Coordinates:** {loc['latitude']:.6f}, {loc['longitude']:.6f}")
                 
-                location_df = pd.DataFrame({
-                    'lat': [loc['latitude']],
-                    'lon': [loc['longitude']]
-                })
-                st.map(location_df, zoom=15)
+                st.map({'lat': [loc['latitude']], 'lon': [loc['longitude']]}, zoom=15)
                 st.caption("Station location on map")
             
             st.markdown("---")
@@ -873,13 +982,23 @@ else:
             col_btn1, col_btn2 = st.columns(2)
             with col_btn1:
                 if st.button("← Back to Location"):
+                    # Edits made after going back must not be saved under the earlier ID
+                    st.session_state.pending_submission = None
                     st.session_state.current_step = 4
                     st.rerun()
             
             with col_btn2:
                 if st.button("Submit Station Registration", type="primary", use_container_width=True):
-                    # Generate unique submission ID
-                    submission_id = f"STA-{datetime.now(NIGERIA_TZ).strftime('%Y%m%d-%H%M%S')}"
+                    # The ID is minted once per registration, so a repeated submit reuses it
+                    resubmit = st.session_state.pending_submission is not None
+                    if not resubmit:
+                        # One clock read per registration; ID, timestamp and summary date derive from it
+                        submitted_at = datetime.now(NIGERIA_TZ)
+                        st.session_state.pending_submission = (
+                            f"STA-{submitted_at.strftime('%Y%m%d-%H%M%S')}-{secrets.token_hex(3).upper()}",
+                            submitted_at
+                        )
+                    submission_id, submitted_at = st.session_state.pending_submission
                     
                     # Prepare final data
                     final_data = {
@@ -887,7 +1006,7 @@ else:
                         'latitude': st.session_state.location_data['latitude'],
                         'longitude': st.session_state.location_data['longitude'],
                         'submission_id': submission_id,
-                        'submission_timestamp': datetime.now(NIGERIA_TZ).isoformat()
+                        'submission_timestamp': submitted_at.isoformat(timespec='seconds')
                     }
                     
                     # Prepare photo data
@@ -900,7 +1019,7 @@ else:
                             photo_bytes = st.session_state.photo_captured.getvalue() if hasattr(st.session_state.photo_captured, 'getvalue') else None
                     
                     # Save to database
-                    if save_submission_to_db(final_data, photo_bytes, st.session_state.photo_metadata):
+                    if save_submission_to_db(final_data, photo_bytes, st.session_state.photo_metadata, resubmit=resubmit):
                         st.balloons()
                         st.success(f"""
                         🎉 **Station Registration Complete!**
@@ -932,7 +1051,7 @@ else:
                             'phone': final_data['phone'],
                             'location': f"{final_data['latitude']:.6f}, {final_data['longitude']:.6f}",
                             'photo_timestamp': st.session_state.photo_metadata.get('timestamp'),
-                            'submission_date': datetime.now(NIGERIA_TZ).strftime('%Y-%m-%d'),
+                            'submission_date': submitted_at.strftime('%Y-%m-%d'),
                             'status': 'pending_review'
                         }
                         
@@ -950,14 +1069,18 @@ else:
                         st.session_state.photo_captured = None
                         st.session_state.photo_metadata = None
                         st.session_state.location_data = None
+                        st.session_state.pending_submission = None
                         
                         if st.button("Register Another Station"):
                             st.rerun()
                     else:
+                        # Nothing was committed under this ID; the next attempt mints a fresh one
+                        st.session_state.pending_submission = None
                         st.error("❌ Error saving registration. Please try again or contact support.")
         else:
             st.error("❌ Missing information. Please go back and complete all steps.")
             if st.button("← Back to Location"):
+                st.session_state.pending_submission = None
                 st.session_state.current_step = 4
                 st.rerun()
 
@@ -1,7 +1,8 @@
 import streamlit as st
 from st_geolocation import geolocate
-import pandas as pd
-import datetime
+import time
+
+TIMESTAMP_FORMAT = "%Y-%m-%d %H:%M:%S"
 
 st.set_page_config(page_title="Station Location — Auto capture", layout="centered")
 st.title("Station Location — Auto capture example")
@@ -32,12 +33,14 @@ with st.form("reg"):
     submitted = st.form_submit_button("Register")
 
 if submitted:
+    name = (name or "").strip()
     if not name:
         st.error("Enter a client name.")
-    else:
-        row = {"Name": name, "Station": station, "Timestamp": datetime.datetime.now().isoformat(sep=' ', timespec='seconds')}
-        if attach and coords and "lat" in coords:
-            row["Latitude"] = coords["lat"]
-            row["Longitude"] = coords["lon"]
-        st.write("Would save:", row)
-        st.success("Registration recorded (example).")
+        st.stop()
+
+    row = {"Name": name, "Station": station, "Timestamp": time.strftime(TIMESTAMP_FORMAT)}
+    if attach and coords and "lat" in coords:
+        row["Latitude"] = coords["lat"]
+        row["Longitude"] = coords["lon"]
+    st.write("Would save:", row)
+    st.success("Registration recorded (example).")
@@ -13,8 +13,17 @@ import io
 import sqlite3
 import csv
 import hashlib
-import pytz
 import uuid
+import secrets
+import queue
+import time
+import html
+import re
+import os
+import tempfile
+import threading
+from concurrent.futures import Future, TimeoutError as FutureTimeoutError
+from zoneinfo import ZoneInfo
 
 # Page configuration
 st.set_page_config(
@@ -26,7 +35,18 @@ st.set_page_config(
 
 # Constants
 APP_VERSION = "4.1.0"
-NIGERIA_TZ = pytz.timezone('Africa/Lagos')
+NIGERIA_TZ = ZoneInfo('Africa/Lagos')
+PHOTO_MAX_EDGE = 1600
+PHOTO_JPEG_QUALITY = 75
+SUBMIT_BATCH_MAX = 50
+SUBMIT_TIMEOUT_SECONDS = 10
+DRAFT_TTL_SECONDS = 6 * 60 * 60
+SUBMIT_FIELDS = (
+    'full_name', 'email', 'phone', 'geopolitical_zone', 'state', 'lga', 'address',
+    'latitude', 'longitude', 'station_name', 'station_type', 'location_source'
+)
+STATION_TYPES = ("Petrol Station", "Gas Station", "Diesel Depot")
+COORDINATE_RE = re.compile(r"^\s*-?\d{1,3}(?:\.\d+)?\s*$")
 
 # Nigerian Geopolitical Zones and States
 NIGERIAN_REGIONS = {
@@ -38,32 +58,108 @@ NIGERIAN_REGIONS = {
     "South West": ["Ekiti", "Lagos", "Ogun", "Ondo", "Osun", "Oyo"]
 }
 
-# Initialize session state
-if 'consent_given' not in st.session_state:
-    st.session_state.consent_given = False
+def now_iso():
+    return datetime.now(NIGERIA_TZ).isoformat()
+
+# Registration flow state; admin keys are kept separate so a reset leaves them alone
+def default_flow_state():
+    return {
+        'consent_given': False,
+        'current_step': 1,
+        'client_data': {},
+        'selected_zone': None,
+        'selected_state': None,
+        'photo_path': None,
+        'photo_source_id': None,
+        'photo_metadata': None,
+        'location_data': None,
+    }
+
+# Keyed widgets start from known values instead of being reconciled on first render
+WIDGET_DEFAULTS = {'manual_lat': '', 'manual_lon': '', 'final_confirmation': False}
+
+# In-progress registrations, shared across sessions and keyed by the ?d= draft id,
+# so a dropped websocket doesn't lose steps already completed. Contact details are
+# left out: anyone holding the URL can resume the draft.
+DRAFT_PII_FIELDS = ('full_name', 'email', 'phone')
+DRAFT_ID_MIN_LENGTH = 22
+
+@st.cache_resource
+def get_draft_store():
+    return {'lock': threading.Lock(), 'drafts': {}}
+
+def current_draft_id():
+    draft_id = st.query_params.get("d")
+    # Short ids are guessable (older links used 10 hex chars), so they get a fresh draft
+    if not draft_id or len(draft_id) < DRAFT_ID_MIN_LENGTH:
+        draft_id = secrets.token_urlsafe(16)
+        st.query_params["d"] = draft_id
+    return draft_id
+
+def load_draft(draft_id):
+    store = get_draft_store()
+    with store['lock']:
+        entry = store['drafts'].get(draft_id)
+    if entry is None or time.time() - entry[0] > DRAFT_TTL_SECONDS:
+        return {}
+    snapshot = dict(entry[1])
+    snapshot['client_data'] = dict(snapshot['client_data'])
+    # The contact details were never saved, so they are re-entered at Step 2
+    snapshot['current_step'] = min(snapshot['current_step'], 2)
+    return snapshot
+
+def _remove_photo_file(path):
+    try:
+        os.remove(path)
+    except OSError:
+        pass
+
+def save_draft(draft_id):
+    snapshot = {key: st.session_state[key] for key in default_flow_state()}
+    snapshot['client_data'] = {
+        key: value for key, value in snapshot['client_data'].items() if key not in DRAFT_PII_FIELDS
+    }
+    now = time.time()
+    store = get_draft_store()
+    with store['lock']:
+        previous = store['drafts'].get(draft_id)
+        store['drafts'][draft_id] = (now, snapshot)
+        stale_ids = [k for k, (saved_at, _) in store['drafts'].items() if now - saved_at > DRAFT_TTL_SECONDS]
+        orphaned = [store['drafts'].pop(k)[1]['photo_path'] for k in stale_ids]
+    # The draft owns its photo file: one it no longer points at, or one evicted with it, is deleted
+    if previous and previous[1]['photo_path'] != snapshot['photo_path']:
+        orphaned.append(previous[1]['photo_path'])
+    for path in orphaned:
+        if path:
+            _remove_photo_file(path)
+
+def drop_missing_photo():
+    """Send the flow back to Step 3 when the photo's temp file is gone; True if it was"""
+    photo_path = st.session_state.photo_path
+    if photo_path is None or os.path.exists(photo_path):
+        return False
+    # Another tab on the same draft replaced the photo and deleted this file
+    st.session_state.photo_path = None
+    st.session_state.photo_source_id = None
+    st.session_state.current_step = min(st.session_state.current_step, 3)
+    return True
+
+# Initialize session state, resuming a saved draft for a fresh session
+DRAFT_ID = current_draft_id()
+flow_state = default_flow_state()
 if 'current_step' not in st.session_state:
-    st.session_state.current_step = 1
-if 'client_data' not in st.session_state:
-    st.session_state.client_data = {}
-if 'selected_zone' not in st.session_state:
-    st.session_state.selected_zone = None
-if 'selected_state' not in st.session_state:
-    st.session_state.selected_state = None
-if 'photo_captured' not in st.session_state:
-    st.session_state.photo_captured = None
-if 'photo_metadata' not in st.session_state:
-    st.session_state.photo_metadata = None
-if 'location_data' not in st.session_state:
-    st.session_state.location_data = None
-if 'admin_authenticated' not in st.session_state:
-    st.session_state.admin_authenticated = False
-if 'view_submissions' not in st.session_state:
-    st.session_state.view_submissions = False
-if 'gps_triggered' not in st.session_state:
-    st.session_state.gps_triggered = False
+    flow_state.update(load_draft(DRAFT_ID))
+for key, value in flow_state.items():
+    st.session_state.setdefault(key, value)
+drop_missing_photo()
+for key, value in WIDGET_DEFAULTS.items():
+    st.session_state.setdefault(key, value)
+st.session_state.setdefault('submitting', False)
+st.session_state.setdefault('admin_authenticated', False)
+st.session_state.setdefault('view_submissions', False)
 
 # Minimal CSS to avoid conflicts
-st.markdown("""
+APP_CSS = """
 <style>
     .main-header {
         font-size: 2.5rem;
@@ -84,13 +180,6 @@ st.markdown("""
     .stButton button:hover {
         background-color: #1E40AF;
     }
-    .consent-box {
-        border: 2px solid #e5e7eb;
-        border-radius: 10px;
-        padding: 2rem;
-        background-color: #f9fafb;
-        margin: 2rem 0;
-    }
     .gps-success {
         background-color: #d1fae5;
         border: 2px solid #10b981;
@@ -125,9 +214,11 @@ st.markdown("""
         border-radius: 5px;
     }
 </style>
-""", unsafe_allow_html=True)
+"""
+st.markdown(APP_CSS, unsafe_allow_html=True)
 
 # Database setup
+@st.cache_resource
 def init_database():
     conn = sqlite3.connect('submissions.db', check_same_thread=False)
     c = conn.cursor()
@@ -159,17 +250,54 @@ def init_database():
 
 DB_CONN = init_database()
 
+SUBMISSION_INSERT_SQL = '''
+    INSERT INTO submissions (
+        submission_id, full_name, email, phone, geopolitical_zone, state, lga, address,
+        latitude, longitude, submission_timestamp, status,
+        photo_data, station_name, station_type, location_source
+    ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+'''
+
+def _submission_writer(write_queue):
+    """Drain queued submissions and commit whatever has piled up in one transaction"""
+    conn = sqlite3.connect('submissions.db')
+    while True:
+        batch = [write_queue.get()]
+        while len(batch) < SUBMIT_BATCH_MAX:
+            try:
+                batch.append(write_queue.get_nowait())
+            except queue.Empty:
+                break
+        # Submits that timed out and cancelled their future are never written
+        batch = [(row, future) for row, future in batch if future.set_running_or_notify_cancel()]
+        if not batch:
+            continue
+        
+        try:
+            with conn:
+                conn.executemany(SUBMISSION_INSERT_SQL, [row for row, _ in batch])
+            for _, future in batch:
+                future.set_result(True)
+        except Exception:
+            # Fall back to one transaction per row so a bad row only fails itself;
+            # nothing may escape, or the cached thread dies and every later submit hangs
+            for row, future in batch:
+                try:
+                    with conn:
+                        conn.execute(SUBMISSION_INSERT_SQL, row)
+                    future.set_result(True)
+                except Exception as e:
+                    future.set_exception(e)
+
+@st.cache_resource
+def get_submission_queue():
+    write_queue = queue.Queue()
+    threading.Thread(target=_submission_writer, args=(write_queue,), daemon=True).start()
+    return write_queue
+
 def save_submission_to_db(submission_data, photo_bytes=None):
     try:
-        c = DB_CONN.cursor()
-        
-        c.execute('''
-            INSERT INTO submissions (
-                submission_id, full_name, email, phone, geopolitical_zone, state, lga, address,
-                latitude, longitude, submission_timestamp, status,
-                photo_data, station_name, station_type, location_source
-            ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-        ''', (
+        row = (
             submission_data.get('submission_id'),
             submission_data.get('full_name'),
             submission_data.get('email'),
@@ -186,10 +314,19 @@ def save_submission_to_db(submission_data, photo_bytes=None):
             submission_data.get('station_name', ''),
             submission_data.get('station_type', ''),
             submission_data.get('location_source', 'manual')
-        ))
+        )
         
-        DB_CONN.commit()
-        return True
+        future = Future()
+        get_submission_queue().put((row, future))
+        try:
+            return future.result(timeout=SUBMIT_TIMEOUT_SECONDS)
+        except FutureTimeoutError:
+            if future.cancel():
+                st.error("The database is busy and your submission was not saved. Please try again.")
+                return False
+            # The writer already holds the row, so wait for its outcome instead of inviting a duplicate retry
+            with st.spinner("Still saving your submission, please don't resubmit..."):
+                return future.result()
     except Exception as e:
         st.error(f"Database error: {str(e)}")
         return False
@@ -207,26 +344,69 @@ def get_all_submissions():
     except:
         return []
 
-# Step indicator
+# Captured photos are spooled to disk; session state only holds the path
+def store_captured_photo(photo):
+    if st.session_state.photo_source_id == photo.file_id:
+        return
+    discard_captured_photo()
+    with tempfile.NamedTemporaryFile(delete=False, suffix=".jpg") as f:
+        f.write(photo.getbuffer())
+    st.session_state.photo_path = f.name
+    st.session_state.photo_source_id = photo.file_id
+
+def discard_captured_photo():
+    if st.session_state.photo_path:
+        _remove_photo_file(st.session_state.photo_path)
+    st.session_state.photo_path = None
+    st.session_state.photo_source_id = None
+
+# Paths are one-off temp files, so entries are bounded instead of kept for the process lifetime
+@st.cache_data(show_spinner=False, max_entries=64, ttl=60 * 60)
+def make_photo_thumbnail(photo_path, width=200):
+    """Small JPEG preview of a spooled photo; each capture has its own path so the path is the cache key"""
+    image = Image.open(photo_path)
+    image.thumbnail((width, width * 3))
+    buf = io.BytesIO()
+    image.convert('RGB').save(buf, format='JPEG', quality=80, optimize=True)
+    return buf.getvalue()
+
+def request_submit():
+    # Form callbacks run before the rerun, so Step 5 knows to skip the summary
+    st.session_state.submitting = st.session_state.final_confirmation
+
+def summary_line(label, value):
+    """HTML paragraph for the review summary; values are user input so they are escaped"""
+    return f"<p>{label}: {html.escape(str(value))}</p>"
+
+# Entries hold full-size JPEGs and only need to outlive a retried submit
+@st.cache_data(show_spinner=False, max_entries=8, ttl=10 * 60)
+def compress_photo(photo_path):
+    """Downscaled, re-encoded JPEG bytes for storage; cached so a retried submit doesn't re-encode"""
+    image = Image.open(photo_path)
+    image.thumbnail((PHOTO_MAX_EDGE, PHOTO_MAX_EDGE))
+    buf = io.BytesIO()
+    image.convert('RGB').save(buf, format='JPEG', quality=PHOTO_JPEG_QUALITY, optimize=True, progressive=True)
+    return buf.getvalue()
+
+# Step indicator, prebuilt once per step so reruns only pick a string
+STEP_NAMES = ["Consent", "Information", "Photo", "Location", "Review"]
+
+def _build_step_indicator(current_step):
+    items = []
+    for i, step in enumerate(STEP_NAMES, 1):
+        active_class = " active" if i == current_step else ""
+        items.append(
+            f'<div class="step{active_class}">'
+            f'<div style="font-size: 1.5rem; margin-bottom: 5px;">{i}</div>'
+            f'<div style="font-size: 0.9rem;">{step}</div>'
+            '</div>'
+        )
+    return f'<div class="step-indicator">{"".join(items)}</div>'
+
+STEP_INDICATOR_HTML = tuple(_build_step_indicator(i) for i in range(1, len(STEP_NAMES) + 1))
+
 def show_step_indicator():
-    steps = ["Consent", "Information", "Photo", "Location", "Review"]
-    
-    html = """
-    <div class="step-indicator">
-    """
-    
-    for i, step in enumerate(steps, 1):
-        is_active = i == st.session_state.current_step
-        active_class = "active" if is_active else ""
-        html += f"""
-        <div class="step {active_class}">
-            <div style="font-size: 1.5rem; margin-bottom: 5px;">{i}</div>
-            <div style="font-size: 0.9rem;">{step}</div>
-        </div>
-        """
-    
-    html += "</div>"
-    st.markdown(html, unsafe_allow_html=True)
+    st.markdown(STEP_INDICATOR_HTML[st.session_state.current_step - 1], unsafe_allow_html=True)
 
 # GPS Function - SIMPLIFIED and only used in Step 4
 def show_gps_component():
@@ -334,6 +514,90 @@ def show_gps_component():
     except:
         pass
 
+# Step 5 runs as a fragment so the review only rerenders itself
+@st.fragment
+def review_step():
+    st.markdown("### Step 5: Review & Submit")
+    
+    # Fragment reruns skip the module-level check, so repeat it before reading the photo
+    if drop_missing_photo():
+        st.rerun(scope="app")
+    
+    cd = st.session_state.client_data
+    
+    # A confirmed submit skips the summary and renders only the spinner while saving
+    if st.session_state.submitting:
+        st.session_state.submitting = False
+        with st.spinner("Submitting registration..."):
+            try:
+                submission_id = f"STN-{uuid.uuid4().hex[:8].upper()}"
+                
+                # Missing keys fall through to save_submission_to_db's defaults
+                submission_data = {key: cd[key] for key in SUBMIT_FIELDS if key in cd}
+                submission_data.update(submission_id=submission_id, submission_timestamp=now_iso())
+                
+                photo_bytes = compress_photo(st.session_state.photo_path) if st.session_state.photo_path else None
+                saved = save_submission_to_db(submission_data, photo_bytes)
+            except Exception as e:
+                st.error(f"Error: {e}")
+                saved = False
+        
+        if saved:
+            st.success(f"✅ Submitted! ID: {submission_id}")
+            
+            # Reset
+            discard_captured_photo()
+            st.session_state.update(default_flow_state())
+            # Widget state is re-seeded from WIDGET_DEFAULTS on the next run
+            for key in WIDGET_DEFAULTS:
+                st.session_state.pop(key, None)
+            
+            st.balloons()
+            st.rerun(scope="app")
+    
+    # One markdown element per column
+    left_html = "".join([
+        "<p><b>Owner Info</b></p>",
+        summary_line("Name", cd.get('full_name')),
+        summary_line("Email", cd.get('email')),
+        summary_line("Phone", cd.get('phone')),
+        "<p><b>Station Info</b></p>",
+        summary_line("Name", cd.get('station_name')),
+        summary_line("Type", cd.get('station_type')),
+    ])
+    right_html = "".join([
+        "<p><b>Location</b></p>",
+        summary_line("Zone", cd.get('geopolitical_zone')),
+        summary_line("State", cd.get('state')),
+        summary_line("LGA", cd.get('lga')),
+    ])
+    lat, lon = cd.get('latitude'), cd.get('longitude')
+    if lat is not None and lon is not None:
+        right_html += f"<p>Coordinates: {lat:.6f}, {lon:.6f}</p>"
+        right_html += summary_line("Source", cd.get('location_source', 'unknown'))
+    
+    col1, col2 = st.columns(2)
+    col1.markdown(left_html, unsafe_allow_html=True)
+    col2.markdown(right_html, unsafe_allow_html=True)
+    
+    if st.session_state.photo_path:
+        st.markdown("**Photo Preview**")
+        st.image(make_photo_thumbnail(st.session_state.photo_path), width=200)
+    
+    st.markdown("---")
+    
+    # Checkbox and submit share a form so ticking the box doesn't rerun anything
+    with st.form("submit_form"):
+        st.checkbox("I confirm all information is correct", key="final_confirmation")
+        submitted = st.form_submit_button("Submit Registration", type="primary", on_click=request_submit)
+    
+    if st.button("← Back"):
+        st.session_state.current_step = 4
+        st.rerun(scope="app")
+    
+    if submitted and not st.session_state.final_confirmation:
+        st.error("Please confirm all information is correct before submitting")
+
 # Main App Header
 st.markdown('<h1 class="main-header">⛽ Station Onboarding System</h1>', unsafe_allow_html=True)
 st.markdown('<p style="text-align: center; color: #4B5563; margin-bottom: 2rem;">Register your filling station in 5 simple steps</p>', unsafe_allow_html=True)
@@ -415,9 +679,7 @@ else:
         - Provide accurate business information
         """)
         
-        st.markdown('<div class="consent-box">', unsafe_allow_html=True)
         consent = st.checkbox("✅ I agree to all terms and conditions")
-        st.markdown('</div>', unsafe_allow_html=True)
         
         if st.button("Continue", type="primary", disabled=not consent):
             st.session_state.consent_given = True
@@ -428,20 +690,34 @@ else:
     elif st.session_state.current_step == 2:
         st.markdown("### Step 2: Station & Owner Information")
         
+        # Prefilled from client_data so a resumed draft or a step back keeps earlier answers
+        cd = st.session_state.client_data
+        
         col1, col2 = st.columns(2)
         with col1:
-            name = st.text_input("Owner Full Name *")
-            email = st.text_input("Email *")
+            name = st.text_input("Owner Full Name *", value=cd.get('full_name', ''))
+            email = st.text_input("Email *", value=cd.get('email', ''))
         with col2:
-            phone = st.text_input("Phone *")
+            phone = st.text_input("Phone *", value=cd.get('phone', ''))
         
-        station_name = st.text_input("Station Name *")
-        station_type = st.selectbox("Station Type *", ["Petrol Station", "Gas Station", "Diesel Depot"])
+        station_name = st.text_input("Station Name *", value=cd.get('station_name', ''))
+        station_type = st.selectbox(
+            "Station Type *", STATION_TYPES,
+            index=STATION_TYPES.index(cd['station_type']) if cd.get('station_type') in STATION_TYPES else 0
+        )
         
-        zone = st.selectbox("Geopolitical Zone *", list(NIGERIAN_REGIONS.keys()))
-        state = st.selectbox("State *", NIGERIAN_REGIONS[zone] if zone else [])
-        lga = st.text_input("LGA *")
-        address = st.text_area("Address")
+        zones = list(NIGERIAN_REGIONS.keys())
+        zone = st.selectbox(
+            "Geopolitical Zone *", zones,
+            index=zones.index(cd['geopolitical_zone']) if cd.get('geopolitical_zone') in zones else 0
+        )
+        states = NIGERIAN_REGIONS[zone] if zone else []
+        state = st.selectbox(
+            "State *", states,
+            index=states.index(cd['state']) if cd.get('state') in states else 0
+        )
+        lga = st.text_input("LGA *", value=cd.get('lga', ''))
+        address = st.text_area("Address", value=cd.get('address', ''))
         
         required = all([name, email, phone, station_name, station_type, zone, state, lga])
         
@@ -467,9 +743,9 @@ else:
         photo = st.camera_input("Take station photo")
         
         if photo:
-            st.session_state.photo_captured = photo
+            store_captured_photo(photo)
             st.success("Photo captured!")
-            st.image(photo, width=300)
+            st.image(st.session_state.photo_path, width=300)
         
         col_prev, col_next = st.columns(2)
         with col_prev:
@@ -477,7 +753,7 @@ else:
                 st.session_state.current_step = 2
                 st.rerun()
         with col_next:
-            if st.button("Continue →", type="primary", disabled=not st.session_state.photo_captured):
+            if st.button("Continue →", type="primary", disabled=not st.session_state.photo_path):
                 st.session_state.current_step = 4
                 st.rerun()
     
@@ -492,21 +768,25 @@ else:
         with st.expander("Manual Entry"):
             col_lat, col_lon = st.columns(2)
             with col_lat:
-                manual_lat = st.text_input("Latitude", placeholder="e.g., 6.5244")
+                manual_lat = st.text_input("Latitude", placeholder="e.g., 6.5244", key="manual_lat")
             with col_lon:
-                manual_lon = st.text_input("Longitude", placeholder="e.g., 3.3792")
+                manual_lon = st.text_input("Longitude", placeholder="e.g., 3.3792", key="manual_lon")
             
             if st.button("Use Manual Coordinates") and manual_lat and manual_lon:
-                try:
-                    st.session_state.location_data = {
-                        'latitude': float(manual_lat),
-                        'longitude': float(manual_lon),
-                        'source': 'manual'
-                    }
-                    st.success("Coordinates saved!")
-                    st.rerun()
-                except:
+                if not (COORDINATE_RE.match(manual_lat) and COORDINATE_RE.match(manual_lon)):
                     st.error("Invalid coordinates")
+                else:
+                    lat, lon = float(manual_lat), float(manual_lon)
+                    if -90 <= lat <= 90 and -180 <= lon <= 180:
+                        st.session_state.location_data = {
+                            'latitude': lat,
+                            'longitude': lon,
+                            'source': 'manual'
+                        }
+                        st.success("Coordinates saved!")
+                        st.rerun()
+                    else:
+                        st.error("Coordinates out of range (latitude -90 to 90, longitude -180 to 180)")
         
         # Check for GPS data (simplified - would use proper backend in production)
         if st.button("I Have Captured GPS Coordinates"):
@@ -539,79 +819,9 @@ else:
     
     # Step 5: Review - CLEAN, no JavaScript
     elif st.session_state.current_step == 5:
-        st.markdown("### Step 5: Review & Submit")
-        
-        col1, col2 = st.columns(2)
-        with col1:
-            st.markdown("**Owner Info**")
-            st.write(f"Name: {st.session_state.client_data.get('full_name')}")
-            st.write(f"Email: {st.session_state.client_data.get('email')}")
-            st.write(f"Phone: {st.session_state.client_data.get('phone')}")
-            
-            st.markdown("**Station Info**")
-            st.write(f"Name: {st.session_state.client_data.get('station_name')}")
-            st.write(f"Type: {st.session_state.client_data.get('station_type')}")
-        
-        with col2:
-            st.markdown("**Location**")
-            st.write(f"Zone: {st.session_state.client_data.get('geopolitical_zone')}")
-            st.write(f"State: {st.session_state.client_data.get('state')}")
-            st.write(f"LGA: {st.session_state.client_data.get('lga')}")
-            
-            if st.session_state.client_data.get('latitude'):
-                st.write(f"Coordinates: {st.session_state.client_data['latitude']:.6f}, {st.session_state.client_data['longitude']:.6f}")
-                st.write(f"Source: {st.session_state.client_data.get('location_source')}")
-        
-        if st.session_state.photo_captured:
-            st.markdown("**Photo Preview**")
-            st.image(st.session_state.photo_captured, width=200)
-        
-        st.markdown("---")
-        confirm = st.checkbox("I confirm all information is correct")
-        
-        col_prev, col_submit = st.columns(2)
-        with col_prev:
-            if st.button("← Back"):
-                st.session_state.current_step = 4
-                st.rerun()
-        with col_submit:
-            if st.button("Submit Registration", type="primary", disabled=not confirm):
-                try:
-                    submission_id = f"STN-{uuid.uuid4().hex[:8].upper()}"
-                    
-                    submission_data = {
-                        'submission_id': submission_id,
-                        'full_name': st.session_state.client_data.get('full_name'),
-                        'email': st.session_state.client_data.get('email'),
-                        'phone': st.session_state.client_data.get('phone'),
-                        'geopolitical_zone': st.session_state.client_data.get('geopolitical_zone'),
-                        'state': st.session_state.client_data.get('state'),
-                        'lga': st.session_state.client_data.get('lga'),
-                        'address': st.session_state.client_data.get('address', ''),
-                        'latitude': st.session_state.client_data.get('latitude'),
-                        'longitude': st.session_state.client_data.get('longitude'),
-                        'submission_timestamp': datetime.now(NIGERIA_TZ).isoformat(),
-                        'station_name': st.session_state.client_data.get('station_name'),
-                        'station_type': st.session_state.client_data.get('station_type'),
-                        'location_source': st.session_state.client_data.get('location_source', 'manual')
-                    }
-                    
-                    photo_bytes = st.session_state.photo_captured.getvalue() if st.session_state.photo_captured else None
-                    
-                    if save_submission_to_db(submission_data, photo_bytes):
-                        st.success(f"✅ Submitted! ID: {submission_id}")
-                        
-                        # Reset
-                        st.session_state.current_step = 1
-                        st.session_state.consent_given = False
-                        st.session_state.client_data = {}
-                        st.session_state.photo_captured = None
-                        st.session_state.location_data = None
-                        
-                        st.balloons()
-                        st.rerun()
-                except Exception as e:
-                    st.error(f"Error: {e}")
+        review_step()
+
+save_draft(DRAFT_ID)
 
 # Footer
 st.markdown("---")
@@ -5,16 +5,19 @@ MIT License - For production use
 
 import streamlit as st
 import json
-import base64
 from datetime import datetime
-import pandas as pd
-from PIL import Image, ImageDraw, ImageFont
 import io
+import os
 import sqlite3
-import csv
 import hashlib
-import pytz
-import uuid
+import hmac
+import queue
+import re
+import secrets
+import threading
+import time
+from concurrent.futures import Future, TimeoutError as FutureTimeoutError
+from zoneinfo import ZoneInfo
 
 # Page configuration
 st.set_page_config(
@@ -26,7 +29,21 @@ st.set_page_config(
 
 # Constants
 APP_VERSION = "4.1.0"
-NIGERIA_TZ = pytz.timezone('Africa/Lagos')
+NIGERIA_TZ = ZoneInfo('Africa/Lagos')
+PHOTO_MAX_EDGE = 1600
+PHOTO_JPEG_QUALITY = 82
+PHOTO_DIR = 'photos'
+SUBMISSIONS_PAGE_SIZE = 100
+SUBMIT_BATCH_MAX = 50
+SUBMIT_TIMEOUT_SECONDS = 10
+ORPHAN_PHOTO_AGE_SECONDS = 60 * 60
+SUBMIT_FIELDS = (
+    'full_name', 'email', 'phone', 'geopolitical_zone', 'state', 'lga', 'address',
+    'latitude', 'longitude', 'station_name', 'station_type', 'location_source'
+)
+COORDINATE_RE = re.compile(r"^\s*-?\d{1,3}(?:\.\d+)?\s*$")
+ADMIN_USERNAME = "admin"
+ADMIN_PASSWORD_SHA256 = hashlib.sha256(b"admin123").hexdigest()
 
 # Nigerian Geopolitical Zones and States
 NIGERIAN_REGIONS = {
@@ -37,6 +54,8 @@ NIGERIAN_REGIONS = {
     "South South": ["Akwa Ibom", "Bayelsa", "Cross River", "Delta", "Edo", "Rivers"],
     "South West": ["Ekiti", "Lagos", "Ogun", "Ondo", "Osun", "Oyo"]
 }
+ZONES = tuple(NIGERIAN_REGIONS)
+STATE_LISTS = {zone: tuple(states) for zone, states in NIGERIAN_REGIONS.items()}
 
 # Initialize session state
 if 'consent_given' not in st.session_state:
@@ -49,8 +68,10 @@ if 'selected_zone' not in st.session_state:
     st.session_state.selected_zone = None
 if 'selected_state' not in st.session_state:
     st.session_state.selected_state = None
-if 'photo_captured' not in st.session_state:
-    st.session_state.photo_captured = None
+if 'photo_bytes' not in st.session_state:
+    st.session_state.photo_bytes = None
+if 'photo_source_id' not in st.session_state:
+    st.session_state.photo_source_id = None
 if 'photo_metadata' not in st.session_state:
     st.session_state.photo_metadata = None
 if 'location_data' not in st.session_state:
@@ -63,7 +84,7 @@ if 'gps_triggered' not in st.session_state:
     st.session_state.gps_triggered = False
 
 # Minimal CSS to avoid conflicts
-st.markdown("""
+APP_CSS = """
 <style>
     .main-header {
         font-size: 2.5rem;
@@ -125,13 +146,21 @@ st.markdown("""
         border-radius: 5px;
     }
 </style>
-""", unsafe_allow_html=True)
+"""
+st.markdown(APP_CSS, unsafe_allow_html=True)
 
 # Database setup
+@st.cache_resource
 def init_database():
     conn = sqlite3.connect('submissions.db', check_same_thread=False)
     c = conn.cursor()
     
+    # WAL appends commits to a log, and NORMAL sync only fsyncs at checkpoints
+    c.execute("PRAGMA journal_mode=WAL")
+    c.execute("PRAGMA synchronous=NORMAL")
+    c.execute("PRAGMA temp_store=MEMORY")
+    c.execute("PRAGMA cache_size=-20000")
+    
     c.execute('''
         CREATE TABLE IF NOT EXISTS submissions (
             id INTEGER PRIMARY KEY AUTOINCREMENT,
@@ -147,29 +176,120 @@ def init_database():
             longitude REAL,
             submission_timestamp TEXT,
             status TEXT DEFAULT 'pending',
-            photo_data BLOB,
+            photo_path TEXT,
             station_name TEXT,
             station_type TEXT,
-            location_source TEXT
+            location_source TEXT,
+            submission_ts_ns INTEGER
         )
     ''')
     
+    # Databases created by older versions lack the newer columns
+    columns = {row[1] for row in c.execute("PRAGMA table_info(submissions)")}
+    if 'photo_path' not in columns:
+        c.execute("ALTER TABLE submissions ADD COLUMN photo_path TEXT")
+    if 'submission_ts_ns' not in columns:
+        c.execute("ALTER TABLE submissions ADD COLUMN submission_ts_ns INTEGER")
+    
+    # Admin list is ordered by newest first, optionally filtered by status
+    c.execute("CREATE INDEX IF NOT EXISTS idx_submissions_ts_ns ON submissions(submission_ts_ns DESC)")
+    c.execute("CREATE INDEX IF NOT EXISTS idx_submissions_status_ts_ns ON submissions(status, submission_ts_ns DESC)")
+    
+    # Rows saved without the epoch column get it from their ISO text (millisecond precision)
+    c.execute('''
+        UPDATE submissions
+        SET submission_ts_ns = CAST(ROUND((julianday(submission_timestamp) - 2440587.5) * 86400000) AS INTEGER) * 1000000
+        WHERE submission_ts_ns IS NULL AND submission_timestamp IS NOT NULL
+    ''')
+    # capp.py shares this table but doesn't write the epoch column; fill it on insert
+    c.execute('''
+        CREATE TRIGGER IF NOT EXISTS trg_submissions_ts_ns AFTER INSERT ON submissions
+        WHEN NEW.submission_ts_ns IS NULL AND NEW.submission_timestamp IS NOT NULL
+        BEGIN
+            UPDATE submissions
+            SET submission_ts_ns = CAST(ROUND((julianday(NEW.submission_timestamp) - 2440587.5) * 86400000) AS INTEGER) * 1000000
+            WHERE id = NEW.id;
+        END
+    ''')
+    c.execute("PRAGMA optimize")
+    
+    os.makedirs(PHOTO_DIR, exist_ok=True)
+    
+    # A process that died between writing a photo and committing its row leaves the file
+    # unreferenced; the age check spares photos whose submit is still in flight elsewhere
+    referenced = {row[0] for row in c.execute("SELECT photo_path FROM submissions WHERE photo_path IS NOT NULL")}
+    cutoff = time.time() - ORPHAN_PHOTO_AGE_SECONDS
+    for entry in os.scandir(PHOTO_DIR):
+        try:
+            if entry.is_file() and entry.path not in referenced and entry.stat().st_mtime < cutoff:
+                os.remove(entry.path)
+        except OSError:
+            # One unreadable entry must not stop the app from starting
+            pass
+    
     conn.commit()
     return conn
 
 DB_CONN = init_database()
 
+SUBMISSION_INSERT_SQL = '''
+    INSERT INTO submissions (
+        submission_id, full_name, email, phone, geopolitical_zone, state, lga, address,
+        latitude, longitude, submission_timestamp, status,
+        photo_path, station_name, station_type, location_source, submission_ts_ns
+    ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+'''
+
+def _submission_writer(write_queue):
+    """Drain queued submissions and commit whatever has piled up in one transaction"""
+    conn = sqlite3.connect('submissions.db')
+    conn.execute("PRAGMA synchronous=NORMAL")
+    while True:
+        batch = [write_queue.get()]
+        while len(batch) < SUBMIT_BATCH_MAX:
+            try:
+                batch.append(write_queue.get_nowait())
+            except queue.Empty:
+                break
+        # Submits that timed out and cancelled their future are never written
+        batch = [(row, future) for row, future in batch if future.set_running_or_notify_cancel()]
+        if not batch:
+            continue
+        
+        try:
+            with conn:
+                conn.executemany(SUBMISSION_INSERT_SQL, [row for row, _ in batch])
+            for _, future in batch:
+                future.set_result(True)
+        except Exception:
+            # Fall back to one transaction per row so a bad row only fails itself;
+            # nothing may escape, or the cached thread dies and every later submit hangs
+            for row, future in batch:
+                try:
+                    with conn:
+                        conn.execute(SUBMISSION_INSERT_SQL, row)
+                    future.set_result(True)
+                except Exception as e:
+                    future.set_exception(e)
+
+@st.cache_resource
+def get_submission_queue():
+    write_queue = queue.Queue()
+    threading.Thread(target=_submission_writer, args=(write_queue,), daemon=True).start()
+    return write_queue
+
 def save_submission_to_db(submission_data, photo_bytes=None):
+    photo_path = None
     try:
-        c = DB_CONN.cursor()
+        # Photos go to disk so the submissions table stays small enough to scan quickly
+        if photo_bytes:
+            path = os.path.join(PHOTO_DIR, f"{submission_data.get('submission_id')}.jpg")
+            # 'xb' refuses to overwrite, so cleanup below only ever removes our own file
+            with open(path, 'xb') as f:
+                f.write(photo_bytes)
+            photo_path = path
         
-        c.execute('''
-            INSERT INTO submissions (
-                submission_id, full_name, email, phone, geopolitical_zone, state, lga, address,
-                latitude, longitude, submission_timestamp, status,
-                photo_data, station_name, station_type, location_source
-            ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-        ''', (
+        row = (
             submission_data.get('submission_id'),
             submission_data.get('full_name'),
             submission_data.get('email'),
@@ -182,15 +302,35 @@ def save_submission_to_db(submission_data, photo_bytes=None):
             submission_data.get('longitude'),
             submission_data.get('submission_timestamp'),
             'pending',
-            photo_bytes,
+            photo_path,
             submission_data.get('station_name', ''),
             submission_data.get('station_type', ''),
-            submission_data.get('location_source', 'manual')
-        ))
+            submission_data.get('location_source', 'manual'),
+            submission_data.get('submission_ts_ns')
+        )
         
-        DB_CONN.commit()
+        # Concurrent submits share one transaction on the writer thread
+        future = Future()
+        get_submission_queue().put((row, future))
+        try:
+            future.result(timeout=SUBMIT_TIMEOUT_SECONDS)
+        except FutureTimeoutError:
+            if future.cancel():
+                if photo_path:
+                    os.remove(photo_path)
+                st.error("The database is busy and your submission was not saved. Please try again.")
+                return False
+            # The writer already holds the row, so wait for its outcome instead of inviting a duplicate retry
+            with st.spinner("Still saving your submission, please don't resubmit..."):
+                future.result()
+        load_submission_count.clear()
+        load_submissions_page.clear()
+        submissions_csv.clear()
         return True
     except Exception as e:
+        # The row was rejected or never queued, so no row points at the photo
+        if photo_path:
+            os.remove(photo_path)
         st.error(f"Database error: {str(e)}")
         return False
 
@@ -199,34 +339,111 @@ def get_all_submissions():
         c = DB_CONN.cursor()
         c.execute('''
             SELECT id, submission_id, full_name, email, phone, geopolitical_zone, state,
-                   latitude, longitude, submission_timestamp, status, location_source
+                   latitude, longitude, submission_ts_ns, status, location_source
             FROM submissions 
-            ORDER BY submission_timestamp DESC
+            ORDER BY submission_ts_ns DESC
         ''')
         return c.fetchall()
     except:
         return []
 
-# Step indicator
-def show_step_indicator():
-    steps = ["Consent", "Information", "Photo", "Location", "Review"]
+def count_submissions():
+    try:
+        return DB_CONN.execute("SELECT COUNT(*) FROM submissions").fetchone()[0]
+    except:
+        return 0
+
+def get_submissions_page(offset=0, limit=SUBMISSIONS_PAGE_SIZE):
+    """One page of the admin table, selecting only the columns it shows"""
+    try:
+        c = DB_CONN.cursor()
+        c.execute('''
+            SELECT submission_id, full_name, phone, geopolitical_zone, state,
+                   latitude, longitude, submission_ts_ns, status
+            FROM submissions 
+            ORDER BY submission_ts_ns DESC
+            LIMIT ? OFFSET ?
+        ''', (limit, offset))
+        return c.fetchall()
+    except:
+        return []
+
+def format_submissions_df(df):
+    """Display formatting for the timestamp and coordinate columns"""
+    import pandas as pd
     
-    html = """
-    <div class="step-indicator">
-    """
+    # Format timestamp
+    if 'Submission Time' in df.columns:
+        df['Submission Time'] = (
+            pd.to_datetime(df['Submission Time'], unit='ns', utc=True)
+            .dt.tz_convert(NIGERIA_TZ)
+            .dt.strftime('%Y-%m-%d %H:%M')
+        )
     
-    for i, step in enumerate(steps, 1):
-        is_active = i == st.session_state.current_step
-        active_class = "active" if is_active else ""
-        html += f"""
-        <div class="step {active_class}">
-            <div style="font-size: 1.5rem; margin-bottom: 5px;">{i}</div>
-            <div style="font-size: 0.9rem;">{step}</div>
-        </div>
-        """
+    # Format coordinates
+    if 'Latitude' in df.columns and 'Longitude' in df.columns:
+        # Column-wise formatting avoids building a Series per row like apply(axis=1)
+        lat, lon = df['Latitude'], df['Longitude']
+        has_coords = lat.notna() & lon.notna()
+        df['Coordinates'] = "N/A"
+        df.loc[has_coords, 'Coordinates'] = (
+            lat[has_coords].map('{:.6f}'.format) + ", " + lon[has_coords].map('{:.6f}'.format)
+        )
+    return df
+
+@st.cache_data(ttl=30, show_spinner=False)
+def load_submission_count():
+    return count_submissions()
+
+@st.cache_data(ttl=30, show_spinner=False)
+def load_submissions_page(page):
+    """Formatted admin table page, cached until the next submission or TTL expiry"""
+    import pandas as pd
+    
+    return format_submissions_df(pd.DataFrame(get_submissions_page((page - 1) * SUBMISSIONS_PAGE_SIZE), columns=[
+        'Submission ID', 'Owner Name', 'Phone', 'Zone', 'State',
+        'Latitude', 'Longitude', 'Submission Time', 'Status'
+    ]))
+
+@st.cache_data(ttl=30, show_spinner=False)
+def submissions_csv():
+    """Full export of every registration and column"""
+    import pandas as pd
+    
+    export_df = format_submissions_df(pd.DataFrame(get_all_submissions(), columns=[
+        'ID', 'Submission ID', 'Owner Name', 'Email', 'Phone', 'Zone', 'State',
+        'Latitude', 'Longitude', 'Submission Time', 'Status', 'Location Source'
+    ]))
+    return export_df.to_csv(index=False).encode('utf-8')
+
+def compress_photo(raw_bytes):
+    """Downscaled, re-encoded JPEG bytes for storage"""
+    from PIL import Image
     
-    html += "</div>"
-    st.markdown(html, unsafe_allow_html=True)
+    image = Image.open(io.BytesIO(raw_bytes))
+    image.thumbnail((PHOTO_MAX_EDGE, PHOTO_MAX_EDGE))
+    buf = io.BytesIO()
+    image.convert('RGB').save(buf, format='JPEG', quality=PHOTO_JPEG_QUALITY, optimize=True, progressive=True)
+    return buf.getvalue()
+
+# Step indicator; the script body reruns on every interaction, so the markup is memoized per step
+STEP_NAMES = ["Consent", "Information", "Photo", "Location", "Review"]
+
+@st.cache_data(show_spinner=False)
+def _build_step_indicator(current_step):
+    items = []
+    for i, step in enumerate(STEP_NAMES, 1):
+        active_class = " active" if i == current_step else ""
+        items.append(
+            f'<div class="step{active_class}">'
+            f'<div style="font-size: 1.5rem; margin-bottom: 5px;">{i}</div>'
+            f'<div style="font-size: 0.9rem;">{step}</div>'
+            '</div>'
+        )
+    return f'<div class="step-indicator">{"".join(items)}</div>'
+
+def show_step_indicator():
+    st.markdown(_build_step_indicator(st.session_state.current_step), unsafe_allow_html=True)
 
 # GPS Function - SIMPLIFIED and only used in Step 4
 def show_gps_component():
@@ -346,7 +563,8 @@ with st.sidebar:
         admin_pass = st.text_input("Password", type="password")
         
         if st.button("Login"):
-            if admin_user == "admin" and admin_pass == "admin123":
+            pass_hash = hashlib.sha256(admin_pass.encode()).hexdigest()
+            if admin_user == ADMIN_USERNAME and hmac.compare_digest(pass_hash, ADMIN_PASSWORD_SHA256):
                 st.session_state.admin_authenticated = True
                 st.success("Login successful!")
                 st.rerun()
@@ -366,33 +584,22 @@ with st.sidebar:
 if st.session_state.admin_authenticated and st.session_state.view_submissions:
     st.markdown("## 📊 Admin Dashboard")
     
-    submissions = get_all_submissions()
-    if submissions:
-        df = pd.DataFrame(submissions, columns=[
-            'ID', 'Submission ID', 'Owner Name', 'Email', 'Phone', 'Zone', 'State',
-            'Latitude', 'Longitude', 'Submission Time', 'Status', 'Location Source'
-        ])
-        
-        # Format timestamp
-        if 'Submission Time' in df.columns:
-            df['Submission Time'] = pd.to_datetime(df['Submission Time']).dt.strftime('%Y-%m-%d %H:%M')
+    total = load_submission_count()
+    if total:
+        page_count = -(-total // SUBMISSIONS_PAGE_SIZE)
+        page = st.number_input("Page", min_value=1, max_value=page_count, value=1, step=1)
+        st.caption(f"{total} registrations, {SUBMISSIONS_PAGE_SIZE} per page")
         
-        # Format coordinates
-        if 'Latitude' in df.columns and 'Longitude' in df.columns:
-            df['Coordinates'] = df.apply(
-                lambda row: f"{row['Latitude']:.6f}, {row['Longitude']:.6f}" 
-                if pd.notna(row['Latitude']) and pd.notna(row['Longitude']) 
-                else "N/A",
-                axis=1
-            )
+        df = load_submissions_page(page)
         
         st.dataframe(df[['Submission ID', 'Owner Name', 'Phone', 'Zone', 'State', 'Coordinates', 'Submission Time', 'Status']])
         
-        if st.button("Export to CSV"):
-            csv_data = df.to_csv(index=False)
-            b64 = base64.b64encode(csv_data.encode()).decode()
-            href = f'<a href="data:file/csv;base64,{b64}" download="registrations.csv">Download CSV</a>'
-            st.markdown(href, unsafe_allow_html=True)
+        st.download_button(
+            "Export to CSV",
+            data=submissions_csv(),
+            file_name="registrations.csv",
+            mime="text/csv"
+        )
     else:
         st.info("No registrations yet")
     
@@ -428,37 +635,42 @@ else:
     elif st.session_state.current_step == 2:
         st.markdown("### Step 2: Station & Owner Information")
         
-        col1, col2 = st.columns(2)
-        with col1:
-            name = st.text_input("Owner Full Name *")
-            email = st.text_input("Email *")
-        with col2:
-            phone = st.text_input("Phone *")
-        
-        station_name = st.text_input("Station Name *")
-        station_type = st.selectbox("Station Type *", ["Petrol Station", "Gas Station", "Diesel Depot"])
+        # Zone stays outside the form so the state list follows it
+        zone = st.selectbox("Geopolitical Zone *", ZONES)
         
-        zone = st.selectbox("Geopolitical Zone *", list(NIGERIAN_REGIONS.keys()))
-        state = st.selectbox("State *", NIGERIAN_REGIONS[zone] if zone else [])
-        lga = st.text_input("LGA *")
-        address = st.text_area("Address")
-        
-        required = all([name, email, phone, station_name, station_type, zone, state, lga])
-        
-        col_prev, col_next = st.columns(2)
-        with col_prev:
-            if st.button("← Back"):
-                st.session_state.current_step = 1
-                st.rerun()
-        with col_next:
-            if st.button("Continue →", type="primary", disabled=not required):
-                st.session_state.client_data.update({
-                    'full_name': name, 'email': email, 'phone': phone,
-                    'station_name': station_name, 'station_type': station_type,
-                    'geopolitical_zone': zone, 'state': state, 'lga': lga, 'address': address
-                })
-                st.session_state.current_step = 3
-                st.rerun()
+        # Text inputs only rerun the script when the form is submitted
+        with st.form("step2_form"):
+            col1, col2 = st.columns(2)
+            with col1:
+                name = st.text_input("Owner Full Name *")
+                email = st.text_input("Email *")
+            with col2:
+                phone = st.text_input("Phone *")
+            
+            station_name = st.text_input("Station Name *")
+            station_type = st.selectbox("Station Type *", ["Petrol Station", "Gas Station", "Diesel Depot"])
+            
+            state = st.selectbox("State *", STATE_LISTS.get(zone, ()))
+            lga = st.text_input("LGA *")
+            address = st.text_area("Address")
+            
+            col_prev, col_next = st.columns(2)
+            with col_prev:
+                if st.form_submit_button("← Back"):
+                    st.session_state.current_step = 1
+                    st.rerun()
+            with col_next:
+                if st.form_submit_button("Continue →", type="primary"):
+                    if not all([name, email, phone, station_name, station_type, zone, state, lga]):
+                        st.error("Please fill all required fields")
+                    else:
+                        st.session_state.client_data.update({
+                            'full_name': name, 'email': email, 'phone': phone,
+                            'station_name': station_name, 'station_type': station_type,
+                            'geopolitical_zone': zone, 'state': state, 'lga': lga, 'address': address
+                        })
+                        st.session_state.current_step = 3
+                        st.rerun()
     
     # Step 3: Photo - CLEAN, no JavaScript
     elif st.session_state.current_step == 3:
@@ -467,9 +679,12 @@ else:
         photo = st.camera_input("Take station photo")
         
         if photo:
-            st.session_state.photo_captured = photo
+            # Recompress once per capture; previews and the submit reuse these bytes
+            if st.session_state.photo_source_id != photo.file_id:
+                st.session_state.photo_bytes = compress_photo(photo.getvalue())
+                st.session_state.photo_source_id = photo.file_id
             st.success("Photo captured!")
-            st.image(photo, width=300)
+            st.image(st.session_state.photo_bytes, width=300)
         
         col_prev, col_next = st.columns(2)
         with col_prev:
@@ -477,7 +692,7 @@ else:
                 st.session_state.current_step = 2
                 st.rerun()
         with col_next:
-            if st.button("Continue →", type="primary", disabled=not st.session_state.photo_captured):
+            if st.button("Continue →", type="primary", disabled=not st.session_state.photo_bytes):
                 st.session_state.current_step = 4
                 st.rerun()
     
@@ -497,16 +712,20 @@ else:
                 manual_lon = st.text_input("Longitude", placeholder="e.g., 3.3792")
             
             if st.button("Use Manual Coordinates") and manual_lat and manual_lon:
-                try:
-                    st.session_state.location_data = {
-                        'latitude': float(manual_lat),
-                        'longitude': float(manual_lon),
-                        'source': 'manual'
-                    }
-                    st.success("Coordinates saved!")
-                    st.rerun()
-                except:
+                if not (COORDINATE_RE.match(manual_lat) and COORDINATE_RE.match(manual_lon)):
                     st.error("Invalid coordinates")
+                else:
+                    lat, lon = float(manual_lat), float(manual_lon)
+                    if -90 <= lat <= 90 and -180 <= lon <= 180:
+                        st.session_state.location_data = {
+                            'latitude': lat,
+                            'longitude': lon,
+                            'source': 'manual'
+                        }
+                        st.success("Coordinates saved!")
+                        st.rerun()
+                    else:
+                        st.error("Coordinates out of range (latitude -90 to 90, longitude -180 to 180)")
         
         # Check for GPS data (simplified - would use proper backend in production)
         if st.button("I Have Captured GPS Coordinates"):
@@ -562,56 +781,52 @@ else:
                 st.write(f"Coordinates: {st.session_state.client_data['latitude']:.6f}, {st.session_state.client_data['longitude']:.6f}")
                 st.write(f"Source: {st.session_state.client_data.get('location_source')}")
         
-        if st.session_state.photo_captured:
+        if st.session_state.photo_bytes:
             st.markdown("**Photo Preview**")
-            st.image(st.session_state.photo_captured, width=200)
+            st.image(st.session_state.photo_bytes, width=200)
         
         st.markdown("---")
-        confirm = st.checkbox("I confirm all information is correct")
         
-        col_prev, col_submit = st.columns(2)
-        with col_prev:
-            if st.button("← Back"):
-                st.session_state.current_step = 4
-                st.rerun()
-        with col_submit:
-            if st.button("Submit Registration", type="primary", disabled=not confirm):
-                try:
-                    submission_id = f"STN-{uuid.uuid4().hex[:8].upper()}"
-                    
-                    submission_data = {
-                        'submission_id': submission_id,
-                        'full_name': st.session_state.client_data.get('full_name'),
-                        'email': st.session_state.client_data.get('email'),
-                        'phone': st.session_state.client_data.get('phone'),
-                        'geopolitical_zone': st.session_state.client_data.get('geopolitical_zone'),
-                        'state': st.session_state.client_data.get('state'),
-                        'lga': st.session_state.client_data.get('lga'),
-                        'address': st.session_state.client_data.get('address', ''),
-                        'latitude': st.session_state.client_data.get('latitude'),
-                        'longitude': st.session_state.client_data.get('longitude'),
-                        'submission_timestamp': datetime.now(NIGERIA_TZ).isoformat(),
-                        'station_name': st.session_state.client_data.get('station_name'),
-                        'station_type': st.session_state.client_data.get('station_type'),
-                        'location_source': st.session_state.client_data.get('location_source', 'manual')
-                    }
+        # Checkbox and submit share a form so ticking the box doesn't rerun anything
+        with st.form("submit_form"):
+            confirm = st.checkbox("I confirm all information is correct")
+            submitted = st.form_submit_button("Submit Registration", type="primary")
+        
+        if st.button("← Back"):
+            st.session_state.current_step = 4
+            st.rerun()
+        
+        if submitted and not confirm:
+            st.error("Please confirm all information is correct before submitting")
+        elif submitted:
+            try:
+                submission_id = f"STN-{secrets.token_hex(4).upper()}"
+                
+                # Missing keys fall through to save_submission_to_db's defaults
+                cd = st.session_state.client_data
+                submission_data = {key: cd[key] for key in SUBMIT_FIELDS if key in cd}
+                ts_ns = time.time_ns()
+                submission_data.update(
+                    submission_id=submission_id,
+                    submission_timestamp=datetime.fromtimestamp(ts_ns / 1e9, NIGERIA_TZ).isoformat(),
+                    submission_ts_ns=ts_ns
+                )
+                
+                if save_submission_to_db(submission_data, st.session_state.photo_bytes):
+                    st.success(f"✅ Submitted! ID: {submission_id}")
                     
-                    photo_bytes = st.session_state.photo_captured.getvalue() if st.session_state.photo_captured else None
+                    # Reset
+                    st.session_state.current_step = 1
+                    st.session_state.consent_given = False
+                    st.session_state.client_data = {}
+                    st.session_state.photo_bytes = None
+                    st.session_state.photo_source_id = None
+                    st.session_state.location_data = None
                     
-                    if save_submission_to_db(submission_data, photo_bytes):
-                        st.success(f"✅ Submitted! ID: {submission_id}")
-                        
-                        # Reset
-                        st.session_state.current_step = 1
-                        st.session_state.consent_given = False
-                        st.session_state.client_data = {}
-                        st.session_state.photo_captured = None
-                        st.session_state.location_data = None
-                        
-                        st.balloons()
-                        st.rerun()
-                except Exception as e:
-                    st.error(f"Error: {e}")
+                    st.balloons()
+                    st.rerun()
+            except Exception as e:
+                st.error(f"Error: {e}")
 
 # Footer
 st.markdown("---")
@@ -4,11 +4,16 @@ GPS → Database → Admin View (No Step HTML Display)
 """
 
 import streamlit as st
-import pandas as pd
 import sqlite3
-import uuid
+import io
+import os
+import re
+import secrets
+import threading
+import time
+from collections import Counter, deque
+from contextlib import contextmanager
 from datetime import datetime
-import base64
 
 # Page config
 st.set_page_config(
@@ -27,10 +32,39 @@ if 'form_data' not in st.session_state:
 if 'admin_mode' not in st.session_state:
     st.session_state.admin_mode = False
 
+# Admin list size, rows per bulk-insert transaction, and rows per CSV export chunk
+ADMIN_ROW_LIMIT = 500
+BULK_INSERT_CHUNK = 10_000
+EXPORT_CHUNK_ROWS = 10_000
+
+# Step headers, indexed by current_step - 1
+STEP_HEADERS = (
+    "Step 1: Capture Location",
+    "Step 2: Station Details",
+    "Step 3: Registration Complete",
+)
+
+# STATION_DEBUG=1 in the server environment turns on SQL tracing and timings for admins
+DEBUG = os.environ.get("STATION_DEBUG") == "1"
+
+# Quoted strings and numbers in traced SQL, masked so no submitted values are kept
+SQL_LITERAL_RE = re.compile(r"'(?:[^']|'')*'|\b\d+(?:\.\d+)?\b")
+
 # Database
+@st.cache_resource
 def init_db():
-    conn = sqlite3.connect('stations_gps.db')
+    # One connection per server process, shared by every session's script thread
+    conn = sqlite3.connect('stations_gps.db', check_same_thread=False)
     c = conn.cursor()
+    
+    # WAL appends commits to a log, and NORMAL sync only fsyncs at checkpoints
+    c.execute("PRAGMA journal_mode=WAL")
+    c.execute("PRAGMA synchronous=NORMAL")
+    c.execute("PRAGMA cache_size=-20000")
+    # Keep admin sort buffers in RAM and read hot pages through mmap instead of read()
+    c.execute("PRAGMA temp_store=MEMORY")
+    c.execute("PRAGMA mmap_size=268435456")
+    
     c.execute('''
         CREATE TABLE IF NOT EXISTS stations (
             id INTEGER PRIMARY KEY AUTOINCREMENT,
@@ -45,21 +79,80 @@ def init_db():
             status TEXT DEFAULT 'active'
         )
     ''')
+    
+    # Admin list is newest first; the index lets SQLite skip the sort
+    c.execute("CREATE INDEX IF NOT EXISTS idx_stations_ts ON stations(timestamp DESC)")
+    
+    # Display formatting happens in SQL, so pandas only receives finished columns;
+    # recreated on startup so an existing database never keeps a stale projection
+    c.execute("DROP VIEW IF EXISTS v_stations_admin")
+    c.execute('''
+        CREATE VIEW v_stations_admin AS
+        SELECT station_id AS ID, station_name AS Name, owner_name AS Owner, phone AS Phone,
+               latitude AS Latitude, longitude AS Longitude,
+               printf('%.6f, %.6f', latitude, longitude) AS Coordinates,
+               accuracy AS Accuracy, strftime('%Y-%m-%d %H:%M', timestamp) AS Time,
+               timestamp
+        FROM stations
+    ''')
     conn.commit()
     return conn
 
 conn = init_db()
 
+@st.cache_resource
+def get_sql_trace_target():
+    """Per-thread slot for the trace deque that statements on that thread are recorded into"""
+    return threading.local()
+
+def get_sql_trace():
+    """This session's most recent traced SQL statements, newest last"""
+    return st.session_state.setdefault('sql_trace', deque(maxlen=200))
+
+def _record_sql(target, statement):
+    trace = getattr(target, 'trace', None)
+    if trace is not None:
+        trace.append(SQL_LITERAL_RE.sub("?", statement))
+
+if DEBUG:
+    # One callback for the shared connection; it records only on threads inside traced_sql(),
+    # so concurrent sessions neither switch each other's tracing off nor leak into it
+    trace_target = get_sql_trace_target()
+    conn.set_trace_callback(lambda statement: _record_sql(trace_target, statement))
+
+@contextmanager
+def traced_sql():
+    """Record statements this session runs inside the block, with literals masked"""
+    if not DEBUG:
+        yield
+        return
+    target = get_sql_trace_target()
+    target.trace = get_sql_trace()
+    try:
+        yield
+    finally:
+        target.trace = None
+
+STATION_INSERT_SQL = '''
+    INSERT INTO stations 
+    (station_id, station_name, owner_name, phone, latitude, longitude, accuracy, timestamp)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+'''
+
+def save_stations_bulk(rows):
+    """Insert station rows with executemany, committing once per BULK_INSERT_CHUNK rows"""
+    for start in range(0, len(rows), BULK_INSERT_CHUNK):
+        with conn:
+            conn.executemany(STATION_INSERT_SQL, rows[start:start + BULK_INSERT_CHUNK])
+    load_stations.clear()
+    load_station_count.clear()
+    stations_csv.clear()
+
 def save_station(station_name, owner_name, phone, gps_data):
     try:
-        c = conn.cursor()
-        station_id = f"STN-{uuid.uuid4().hex[:6].upper()}"
+        station_id = f"STN-{secrets.token_hex(3).upper()}"
         
-        c.execute('''
-            INSERT INTO stations 
-            (station_id, station_name, owner_name, phone, latitude, longitude, accuracy, timestamp)
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?)
-        ''', (
+        row = (
             station_id,
             station_name,
             owner_name,
@@ -68,25 +161,149 @@ def save_station(station_name, owner_name, phone, gps_data):
             gps_data['longitude'],
             gps_data.get('accuracy', 0),
             datetime.now().isoformat()
-        ))
+        )
         
-        conn.commit()
+        # Single registrations skip executemany; the statement cache reuses the prepared INSERT
+        with conn:
+            conn.execute(STATION_INSERT_SQL, row)
+        load_stations.clear()
+        load_station_count.clear()
+        stations_csv.clear()
         return station_id
     except Exception as e:
         return None
 
+# Admin list and CSV export both read from the v_stations_admin view, newest first;
+# a view's own ORDER BY isn't guaranteed to survive the outer query, so it lives here
+STATIONS_SELECT_SQL = '''
+    SELECT ID, Name, Owner, Phone, Latitude, Longitude, Coordinates, Accuracy, Time
+    FROM v_stations_admin
+    ORDER BY timestamp DESC
+'''
+
 def get_all_stations():
+    """Admin rows read straight into a DataFrame with display column names"""
+    import pandas as pd
+    
     try:
-        c = conn.cursor()
-        c.execute('''
-            SELECT station_id, station_name, owner_name, phone, 
-                   latitude, longitude, accuracy, timestamp
-            FROM stations 
-            ORDER BY timestamp DESC
-        ''')
-        return c.fetchall()
+        # Arrow-backed columns hold the text fields without per-cell Python str objects
+        return pd.read_sql_query(
+            STATIONS_SELECT_SQL + " LIMIT ?", conn,
+            params=(ADMIN_ROW_LIMIT,), dtype_backend='pyarrow'
+        )
     except:
-        return []
+        return pd.DataFrame()
+
+def count_stations():
+    try:
+        return conn.execute("SELECT COUNT(*) FROM stations").fetchone()[0]
+    except:
+        return 0
+
+@st.cache_data(ttl=60, show_spinner=False)
+def load_stations():
+    """Admin DataFrame, cached until the next registration or TTL expiry"""
+    return get_all_stations()
+
+@st.cache_data(ttl=60, show_spinner=False)
+def load_station_count():
+    return count_stations()
+
+@st.cache_data(ttl=60, show_spinner=False)
+def stations_csv():
+    """Full export, read and written in chunks so only one chunk is held as a DataFrame"""
+    import pandas as pd
+    
+    buf = io.BytesIO()
+    chunks = pd.read_sql_query(STATIONS_SELECT_SQL, conn, chunksize=EXPORT_CHUNK_ROWS)
+    for i, chunk in enumerate(chunks):
+        chunk.to_csv(buf, index=False, header=(i == 0), mode='wb', encoding='utf-8')
+    return buf.getvalue()
+
+# GPS button for Step 1; a constant so the markup lives outside the step logic
+GPS_HTML = """
+    <div style="text-align: center; margin: 30px 0;">
+        <button onclick="getGPS()" style="
+            background: #1E3A8A;
+            color: white;
+            border: none;
+            padding: 15px 30px;
+            border-radius: 8px;
+            font-size: 1.1rem;
+            font-weight: bold;
+            cursor: pointer;
+        ">
+            📍 Get GPS Location
+        </button>
+        
+        <div id="status" style="margin-top: 20px; padding: 15px; min-height: 60px;">
+            Click button to start
+        </div>
+    </div>
+    
+    <script>
+    function getGPS() {
+        const status = document.getElementById('status');
+        status.innerHTML = '<p style="color: orange;">Requesting location... Please allow access</p>';
+        
+        if (navigator.geolocation) {
+            navigator.geolocation.getCurrentPosition(
+                function(pos) {
+                    status.innerHTML = 
+                        '<p style="color: green; font-weight: bold;">✅ Location captured!</p>' +
+                        '<p>Latitude: ' + pos.coords.latitude.toFixed(6) + '</p>' +
+                        '<p>Longitude: ' + pos.coords.longitude.toFixed(6) + '</p>';
+                    
+                    // Store for Streamlit
+                    localStorage.setItem('gps_lat', pos.coords.latitude);
+                    localStorage.setItem('gps_lon', pos.coords.longitude);
+                },
+                function(err) {
+                    status.innerHTML = '<p style="color: red;">Failed to get location. Please try again.</p>';
+                }
+            );
+        } else {
+            status.innerHTML = '<p style="color: red;">GPS not supported</p>';
+        }
+    }
+    </script>
+    """
+
+# Export runs as a fragment so its clicks don't re-query and redraw the admin table
+@st.fragment
+def export_csv():
+    if st.button("Export to CSV"):
+        st.download_button(
+            "Download CSV",
+            data=stations_csv(),
+            file_name="stations.csv",
+            mime="text/csv"
+        )
+
+# Manual entry runs as a fragment so typing coordinates doesn't rerender the GPS component
+@st.fragment
+def manual_entry():
+    col1, col2 = st.columns(2)
+    with col1:
+        lat = st.text_input("Latitude", key="man_lat")
+    with col2:
+        lon = st.text_input("Longitude", key="man_lon")
+    
+    if st.button("Use Manual Entry") and lat and lon:
+        try:
+            latitude, longitude = float(lat), float(lon)
+        except ValueError:
+            st.error("Invalid coordinates")
+        else:
+            st.session_state.gps_data = {
+                'latitude': latitude,
+                'longitude': longitude,
+                'accuracy': 50.0,
+                'source': 'manual'
+            }
+            st.success("Coordinates set!")
+            # App-wide rerun so the navigation below picks up the new coordinates
+            st.rerun(scope="app")
 
 # SIMPLE TITLE - NO COMPLEX HTML
 st.title("⛽ Station Registration System")
@@ -105,28 +322,29 @@ with st.sidebar:
         if st.button("Back to Registration", use_container_width=True):
             st.session_state.admin_mode = False
             st.rerun()
+    
+    if DEBUG and st.session_state.admin_mode:
+        with st.expander("🔍 Perf"):
+            trace = list(get_sql_trace())
+            counts = Counter(" ".join(statement.split())[:80] for statement in trace)
+            st.caption(f"Last {len(trace)} SQL statements")
+            st.dataframe(
+                [{'Statement': statement, 'Count': count} for statement, count in counts.most_common()],
+                hide_index=True
+            )
 
 # MAIN CONTENT
 if st.session_state.admin_mode:
     # ADMIN VIEW
     st.header("📊 Station Registrations")
     
-    stations = get_all_stations()
+    started = time.perf_counter()
+    with traced_sql():
+        df = load_stations()
+    if DEBUG:
+        st.caption(f"load_stations: {(time.perf_counter() - started) * 1000:.1f} ms")
     
-    if stations:
-        df = pd.DataFrame(stations, columns=[
-            'ID', 'Name', 'Owner', 'Phone', 'Latitude', 'Longitude', 'Accuracy', 'Time'
-        ])
-        
-        # Format coordinates
-        df['Coordinates'] = df.apply(
-            lambda row: f"{row['Latitude']:.6f}, {row['Longitude']:.6f}", 
-            axis=1
-        )
-        
-        # Format time
-        df['Time'] = pd.to_datetime(df['Time']).dt.strftime('%Y-%m-%d %H:%M')
-        
+    if not df.empty:
         # Show table
         st.dataframe(
             df[['ID', 'Name', 'Owner', 'Phone', 'Coordinates', 'Accuracy', 'Time']],
@@ -134,12 +352,13 @@ if st.session_state.admin_mode:
             hide_index=True
         )
         
+        # The table is capped at ADMIN_ROW_LIMIT rows; say so instead of passing it off as everything
+        total = load_station_count()
+        if total > len(df):
+            st.caption(f"Showing the latest {len(df)} of {total} stations. Export to CSV for the full list.")
+        
         # Export
-        if st.button("Export to CSV"):
-            csv = df.to_csv(index=False)
-            b64 = base64.b64encode(csv.encode()).decode()
-            href = f'<a href="data:file/csv;base64,{b64}" download="stations.csv">Download CSV</a>'
-            st.markdown(href, unsafe_allow_html=True)
+        export_csv()
     
     else:
         st.info("No stations registered yet")
@@ -150,20 +369,13 @@ if st.session_state.admin_mode:
 
 else:
     # SIMPLE STEP INDICATOR - Using Streamlit Native Components
-    steps = ["Location", "Details", "Complete"]
     current = st.session_state.current_step
     
     # Create a simple progress indicator
-    progress = current / len(steps)
-    st.progress(progress)
+    st.progress(current / len(STEP_HEADERS))
     
     # Show current step as header
-    if current == 1:
-        st.header("Step 1: Capture Location")
-    elif current == 2:
-        st.header("Step 2: Station Details")
-    elif current == 3:
-        st.header("Step 3: Registration Complete")
+    st.header(STEP_HEADERS[current - 1])
     
     st.markdown("---")
     
@@ -187,76 +399,11 @@ else:
         st.info("Click the button below to capture GPS coordinates. Allow location access when prompted.")
         
         # GPS Button
-        gps_html = """
-        <div style="text-align: center; margin: 30px 0;">
-            <button onclick="getGPS()" style="
-                background: #1E3A8A;
-                color: white;
-                border: none;
-                padding: 15px 30px;
-                border-radius: 8px;
-                font-size: 1.1rem;
-                font-weight: bold;
-                cursor: pointer;
-            ">
-                📍 Get GPS Location
-            </button>
-            
-            <div id="status" style="margin-top: 20px; padding: 15px; min-height: 60px;">
-                Click button to start
-            </div>
-        </div>
-        
-        <script>
-        function getGPS() {
-            const status = document.getElementById('status');
-            status.innerHTML = '<p style="color: orange;">Requesting location... Please allow access</p>';
-            
-            if (navigator.geolocation) {
-                navigator.geolocation.getCurrentPosition(
-                    function(pos) {
-                        status.innerHTML = 
-                            '<p style="color: green; font-weight: bold;">✅ Location captured!</p>' +
-                            '<p>Latitude: ' + pos.coords.latitude.toFixed(6) + '</p>' +
-                            '<p>Longitude: ' + pos.coords.longitude.toFixed(6) + '</p>';
-                        
-                        // Store for Streamlit
-                        localStorage.setItem('gps_lat', pos.coords.latitude);
-                        localStorage.setItem('gps_lon', pos.coords.longitude);
-                    },
-                    function(err) {
-                        status.innerHTML = '<p style="color: red;">Failed to get location. Please try again.</p>';
-                    }
-                );
-            } else {
-                status.innerHTML = '<p style="color: red;">GPS not supported</p>';
-            }
-        }
-        </script>
-        """
-        
-        st.components.v1.html(gps_html, height=200)
+        st.components.v1.html(GPS_HTML, height=200)
         
         # Manual entry
         with st.expander("Manual Entry"):
-            col1, col2 = st.columns(2)
-            with col1:
-                lat = st.text_input("Latitude", key="man_lat")
-            with col2:
-                lon = st.text_input("Longitude", key="man_lon")
-            
-            if st.button("Use Manual Entry") and lat and lon:
-                try:
-                    st.session_state.gps_data = {
-                        'latitude': float(lat),
-                        'longitude': float(lon),
-                        'accuracy': 50.0,
-                        'source': 'manual'
-                    }
-                    st.success("Coordinates set!")
-                    st.rerun()
-                except:
-                    st.error("Invalid coordinates")
+            manual_entry()
         
         # Navigation
         col1, col2 = st.columns(2)
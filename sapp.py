@@ -28,9 +28,20 @@ if 'admin_mode' not in st.session_state:
     st.session_state.admin_mode = False
 
 # Database
+@st.cache_resource
 def init_db():
-    conn = sqlite3.connect('stations_gps.db')
+    # One connection per server process, shared by every session's script thread
+    conn = sqlite3.connect('stations_gps.db', check_same_thread=False)
     c = conn.cursor()
+    
+    # WAL appends commits to a log, and NORMAL sync only fsyncs at checkpoints
+    c.execute("PRAGMA journal_mode=WAL")
+    c.execute("PRAGMA synchronous=NORMAL")
+    c.execute("PRAGMA cache_size=-20000")
+    # Keep sort buffers in RAM and read hot pages through mmap instead of read()
+    c.execute("PRAGMA temp_store=MEMORY")
+    c.execute("PRAGMA mmap_size=268435456")
+    
     c.execute('''
         CREATE TABLE IF NOT EXISTS stations (
             id INTEGER PRIMARY KEY AUTOINCREMENT,
@@ -44,6 +55,9 @@ def init_db():
             timestamp TEXT
         )
     ''')
+    
+    # Admin list is newest first; the index lets SQLite skip the sort
+    c.execute("CREATE INDEX IF NOT EXISTS idx_stations_ts ON stations(timestamp DESC)")
     conn.commit()
     return conn
 
@@ -70,24 +84,40 @@ def save_station(station_name, owner_name, phone, gps_data):
         ))
         
         conn.commit()
+        load_stations_df.clear()
         return station_id
     except Exception as e:
         st.error(f"Database error: {e}")
         return None
 
 def get_all_stations():
+    """Admin rows read straight into a DataFrame with display column names"""
     try:
-        c = conn.cursor()
-        c.execute('''
-            SELECT station_id, station_name, owner_name, phone, 
-                   latitude, longitude, accuracy, timestamp
+        return pd.read_sql_query('''
+            SELECT station_id AS ID, station_name AS Name, owner_name AS Owner, phone AS Phone, 
+                   latitude AS Latitude, longitude AS Longitude, accuracy AS Accuracy, timestamp AS Time
             FROM stations 
             ORDER BY timestamp DESC
-        ''')
-        return c.fetchall()
+        ''', conn, parse_dates=['Time'])
     except Exception as e:
         st.error(f"Fetch error: {e}")
-        return []
+        return pd.DataFrame()
+
+@st.cache_data(ttl=30, show_spinner=False)
+def load_stations_df():
+    """Admin DataFrame with display columns, cached until the next registration or TTL expiry"""
+    df = get_all_stations()
+    if df.empty:
+        return df
+    
+    # Format coordinates - BOTH LATITUDE AND LONGITUDE
+    df['Coordinates'] = (
+        "Lat: " + df['Latitude'].map('{:.6f}'.format)
+        + ", Lon: " + df['Longitude'].map('{:.6f}'.format)
+    )
+    
+    df['Time'] = df['Time'].dt.strftime('%Y-%m-%d %H:%M')
+    return df
 
 # Clean title
 st.title("⛽ Fuel Station GPS Registration")
@@ -112,21 +142,9 @@ if st.session_state.admin_mode:
     # ADMIN VIEW
     st.header("📊 All Station Registrations")
     
-    stations = get_all_stations()
+    df = load_stations_df()
     
-    if stations:
-        df = pd.DataFrame(stations, columns=[
-            'ID', 'Name', 'Owner', 'Phone', 'Latitude', 'Longitude', 'Accuracy', 'Time'
-        ])
-        
-        # Format coordinates - BOTH LATITUDE AND LONGITUDE
-        df['Coordinates'] = df.apply(
-            lambda row: f"Lat: {row['Latitude']:.6f}, Lon: {row['Longitude']:.6f}", 
-            axis=1
-        )
-        
-        df['Time'] = pd.to_datetime(df['Time']).dt.strftime('%Y-%m-%d %H:%M')
-        
+    if not df.empty:
         # Display BOTH columns separately
         st.dataframe(
             df[['ID', 'Name', 'Owner', 'Phone', 'Latitude', 'Longitude', 'Accuracy', 'Time']],